@@ -3,13 +3,148 @@ import requests
 import csv
 import os
 import datetime
+import threading
+import argparse
+import asyncio
+import gzip
+import io
+import hashlib
+import json
+import shutil
+import random
+import sys
+import time
+import email.utils
+import codecs
+import functools
+import multiprocessing
+import queue
+import heapq
+import math
+import mmap
+import sqlite3
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
 
 # Constants
 CSV_FILE = "executive_orders.csv"
 LAST_DATE_FILE = "last_eo_date.txt"
+# SQLite index of the document numbers in CSV_FILE, so dedup doesn't re-read the whole CSV
+DOCUMENT_INDEX_FILE = "executive_orders.index.sqlite"
+# "sqlite", or "sorted" for a flat file of fixed-width sorted document numbers searched through mmap
+DOCUMENT_INDEX_KIND = "sqlite"
+SORTED_INDEX_FILE = "executive_orders.idx"
+# Persisted Bloom filter consulted before the exact index: a miss proves a document is new
+BLOOM_FILTER_ENABLED = False
+BLOOM_FILTER_FILE = "executive_orders.bloom"
+BLOOM_FP_RATE = 0.01
+# Smallest capacity a filter is sized for; it is rebuilt at twice the size once it fills up
+BLOOM_MIN_CAPACITY = 100000
+# Where orders and the last publication date are recorded: "csv" (CSV_FILE and LAST_DATE_FILE)
+# or "sqlite" (SQLITE_DB_FILE, safe to read while the checker writes)
+STORAGE_BACKEND = "csv"
+SQLITE_DB_FILE = "executive_orders.sqlite"
+TXT_OUTPUT_DIR = "executive_order_txt"
+MD_OUTPUT_DIR = "executive_order_md"
+JSON_OUTPUT_DIR = "executive_order_json"
+OUTPUT_FORMAT_CHOICES = ("txt", "md", "json")
+# Formats written for each document; any combination is produced from a single parse
+OUTPUT_FORMATS = ("txt",)
 DEFAULT_START_DATE = "2025-01-20"
+# The last recorded publication day counts as closed once it is more than this many days old;
+# fetches then start the day after it instead of re-fetching the whole day
+BOUNDARY_DAY_GRACE_DAYS = 1
 BASE_API_URL = "https://www.federalregister.gov/api/v1/documents.json"
+PER_PAGE = 1000
+# Maximum number of result pages fetched concurrently after the first one
+PAGE_WORKERS = 4
+# Concurrent XML downloads (and API pages in the asyncio engine)
+DOWNLOAD_WORKERS = 8
+# Pipeline engine: bounded queue size between stages, and conversion processes
+PIPELINE_QUEUE_SIZE = 32
+CONVERT_PROCESSES = os.cpu_count() or 1
+# XML documents handed to a conversion process per task
+CONVERT_CHUNKSIZE = 8
+# Bytes read from the response at a time when streaming API results or XML
+STREAM_CHUNK_SIZE = 64 * 1024
+# Convert XML while it downloads instead of buffering whole documents
+STREAM_XML = False
+# XML parser backend: "auto" (lxml when installed), "lxml" or "stdlib"; output is identical
+XML_BACKEND = "auto"
+
+# Per-document record of the XML hash and converter version behind each output, so unchanged
+# documents are not converted again. Bump CONVERTER_VERSION whenever conversion output changes.
+CONVERSION_MANIFEST_ENABLED = True
+CONVERSION_MANIFEST_FILE = "conversion_manifest.json"
+CONVERTER_VERSION = 2
+# Recorded conversions between manifest saves, so an interrupted run keeps most of its progress
+MANIFEST_SAVE_EVERY = 50
+# Convert every document regardless of the manifest (the manifest is still updated)
+FORCE_RECONVERT = False
+
+# Keep downloaded XML, gzipped and stored by SHA-256, so outputs can be re-rendered offline.
+# refs/<document_number> holds the digest of the document's latest XML.
+XML_ARCHIVE_ENABLED = False
+XML_ARCHIVE_DIR = "xml_archive"
+
+# HTTP connection settings (seconds)
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+# Keep-alive connections kept per host; should cover the largest number of concurrent requests
+HTTP_POOL_SIZE = 10
+
+# On-disk HTTP cache revalidated with ETag / Last-Modified
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_DIR = ".http_cache"
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Retry policy shared by API and XML requests
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Retries allowed per run across all requests
+RETRY_BUDGET = 100
+# Consecutive failures before a host is short-circuited, and for how many seconds
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 60
+
+# Directory holding per-shard progress of backfill runs
+BACKFILL_CHECKPOINT_DIR = "backfill_checkpoints"
+
+# Client-side rate limits per host: (requests per second, burst size)
+RATE_LIMITS = {
+    "www.federalregister.gov": (10.0, 20),
+}
+DEFAULT_RATE_LIMIT = (10.0, 20)
+
+# Query results for closed ISO weeks are kept permanently
+WINDOW_CACHE_ENABLED = True
+WINDOW_CACHE_DIR = ".window_cache"
+# Weeks ending within this many days of today are still re-queried
+WINDOW_GRACE_DAYS = 7
+
+# Federal Register XML elements by role, for the Markdown and JSON outputs. Text outside these
+# elements still becomes a paragraph, so nothing in the plain text output is dropped.
+HEADING_TAGS = {"HD"}
+# HD's SOURCE attribute gives the heading level
+HEADING_LEVELS = {"HED": 1, "HD1": 2, "HD2": 3, "HD3": 4}
+DEFAULT_HEADING_LEVEL = 2
+PARAGRAPH_TAGS = {"P", "FP", "EXECORDR", "PRES", "FRDOC"}
+SIGNATURE_TAGS = {"PSIG", "PLACE", "DATE"}
+TABLE_TAG = "GPOTABLE"
+# Text set around an inline child's content within a block: emphasis runs on into the
+# surrounding words, SU becomes a footnote marker and any other child is set off by spaces
+INLINE_MARKERS = {"E": ("", ""), "SU": ("[^", "]")}
+DEFAULT_INLINE_MARKER = (" ", " ")
 
 # Only the required fields
 CSV_COLUMNS = [
@@ -19,43 +154,1060 @@ CSV_COLUMNS = [
     "pdf_url",
     "html_url"
 ]
+# Fields generate_xml_url needs in addition to the CSV columns
+XML_URL_FIELDS = ["publication_date", "document_number"]
+# Request only the fields we use instead of the full document representation
+PROJECT_FIELDS = True
 
 def get_start_date():
-    if os.path.exists(LAST_DATE_FILE):
-        with open(LAST_DATE_FILE, "r") as f:
-            return f.read().strip()
-    return DEFAULT_START_DATE
+    return get_storage().get_cursor().date
 
 def set_start_date(new_date_str):
-    with open(LAST_DATE_FILE, "w") as f:
-        f.write(new_date_str)
+    get_storage().set_cursor(FetchCursor(new_date_str))
+
+def get_fetch_cursor():
+    return get_storage().get_cursor()
+
+class FetchCursor:
+    # The last recorded publication date plus the document numbers already recorded on it, so a
+    # poll can skip that day's known orders, or the whole day once no more can appear
+    def __init__(self, date, seen=()):
+        self.date = date
+        self.seen = frozenset(seen)
+
+    def __eq__(self, other):
+        return isinstance(other, FetchCursor) and (self.date, self.seen) == (other.date, other.seen)
+
+    def is_closed(self):
+        closed_before = datetime.date.today() - datetime.timedelta(days=BOUNDARY_DAY_GRACE_DAYS)
+        return bool(self.seen) and parse_date(self.date) < closed_before
+
+    def query_start_date(self):
+        # Equivalent to a strict `gt` on the last date, which the date-granular API can't express
+        if self.is_closed():
+            return (parse_date(self.date) + datetime.timedelta(days=1)).isoformat()
+        return self.date
+
+    def already_recorded(self, order):
+        return order.get("publication_date") == self.date and order.get("document_number") in self.seen
+
+    def advanced(self, orders):
+        # Backfills of older ranges must never move the watermark backwards
+        dates = [o.get("publication_date") for o in orders if o.get("publication_date")]
+        if not dates or max(dates) < self.date:
+            return self
+        max_date = max(dates)
+        seen = {o.get("document_number") for o in orders
+                if o.get("publication_date") == max_date and o.get("document_number")}
+        return FetchCursor(max_date, seen | self.seen if max_date == self.date else seen)
+
+def is_new_order(order, cursor, processed_docs):
+    # Orders the cursor already knows about are dropped without an index lookup
+    return not cursor.already_recorded(order) and order.get("document_number") not in processed_docs
+
+def csv_document_numbers(csv_text, fieldnames=None):
+    for row in csv.DictReader(io.StringIO(csv_text), fieldnames=fieldnames):
+        doc_num = row.get("document_number")
+        if doc_num:
+            yield doc_num
+
+class CsvIndex:
+    # Persistent set of the document numbers recorded in CSV_FILE. The CSV's size, mtime and a
+    # fingerprint of its last bytes are stored with the index: a CSV that only grew since (rows
+    # appended by an interrupted run) still has the recorded bytes at the recorded size, and has
+    # just its new tail indexed, while any other change rebuilds the index from scratch.
+    # Subclasses provide the storage through _recorded_state and _store, and the lookups.
+    # Shared between threads, so every query holds the lock.
+    FINGERPRINT_BYTES = 4096
+
+    def __init__(self, csv_path=CSV_FILE):
+        self.csv_path = csv_path
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, size):
+        # Hash of the bytes just before size, so an edit to the indexed rows shows even if the CSV grew
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            with open(self.csv_path, "rb") as f:
+                start = max(0, size - self.FINGERPRINT_BYTES)
+                f.seek(start)
+                digest.update(f.read(size - start))
+        except OSError:
+            pass
+        return digest.hexdigest()
+
+    def _csv_state(self):
+        try:
+            stat = os.stat(self.csv_path)
+        except OSError:
+            return 0, 0, self._fingerprint(0)
+        return stat.st_size, stat.st_mtime_ns, self._fingerprint(stat.st_size)
+
+    def sync(self):
+        with self._lock:
+            state = self._csv_state()
+            size, mtime_ns, fingerprint = self._recorded_state()
+            if state == (size, mtime_ns, fingerprint):
+                return
+            if state[0] == 0:
+                self._store([], state, reset=True)
+                return
+            with open(self.csv_path, "rb") as f:
+                header = f.readline()
+                if 0 < size < state[0] and self._fingerprint(size) == fingerprint:
+                    f.seek(size)
+                    tail = f.read().decode("utf-8")
+                    fieldnames = next(csv.reader([header.decode("utf-8")]))
+                    self._store(csv_document_numbers(tail, fieldnames), state)
+                    return
+                if size != 0:
+                    # A recorded size of 0 means the CSV didn't exist yet; there is nothing to rebuild
+                    print(f"Rebuilding the document index from {self.csv_path}.")
+                text = (header + f.read()).decode("utf-8")
+            self._store(csv_document_numbers(text), state, reset=True)
+
+    def index_state(self):
+        # Changes whenever the indexed CSV does, for caches derived from the index
+        with self._lock:
+            return list(self._recorded_state())
+
+    def add(self, doc_nums):
+        # Called right after rows were appended to the CSV, so the index stays in lockstep with it.
+        # If a sync since the append already indexed them, the index isn't written a second time.
+        with self._lock:
+            state = self._csv_state()
+            if state == self._recorded_state():
+                return
+            self._store([d for d in doc_nums if d], state)
+
+class DocumentIndex(CsvIndex):
+    # Document numbers as the primary key of a SQLite table
+    def __init__(self, path=DOCUMENT_INDEX_FILE, csv_path=CSV_FILE):
+        super().__init__(csv_path)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS documents (document_number TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.sync()
+
+    def __contains__(self, doc_num):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM documents WHERE document_number = ?", (doc_num,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def __iter__(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT document_number FROM documents").fetchall()
+        return (row[0] for row in rows)
+
+    def _recorded_state(self):
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        return int(meta.get("csv_size", -1)), int(meta.get("csv_mtime_ns", -1)), meta.get("csv_fingerprint", "")
+
+    def _store(self, doc_nums, state, reset=False):
+        with self._conn:
+            if reset:
+                self._conn.execute("DELETE FROM documents")
+            self._conn.executemany("INSERT OR IGNORE INTO documents VALUES (?)", ((d,) for d in doc_nums))
+            self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                   [("csv_size", str(state[0])), ("csv_mtime_ns", str(state[1])),
+                                    ("csv_fingerprint", state[2])])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class SortedDocumentIndex(CsvIndex):
+    # Flat-file index: a fixed-size header, then every document number padded with spaces to the
+    # same width and sorted. Lookups binary-search the memory-mapped file, so opening it costs
+    # nothing and no Python object is created per recorded document. New numbers are merged in
+    # by rewriting the file in one sequential pass and atomically replacing it.
+    HEADER_SIZE = 128
+    MAGIC = b"EOIDX2"
+
+    def __init__(self, path=SORTED_INDEX_FILE, csv_path=CSV_FILE):
+        super().__init__(csv_path)
+        self.path = path
+        self._file = None
+        self._map = None
+        self.width = 0
+        self.count = 0
+        self._state = (-1, -1, "")
+        self._open()
+        self.sync()
+
+    def _open(self):
+        self._close_map()
+        self.width, self.count, self._state = 0, 0, (-1, -1, "")
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        header = self._file.read(self.HEADER_SIZE).split()
+        if len(header) != 6 or header[0] != self.MAGIC:
+            print(f"Ignoring unreadable document index {self.path}.")
+            self._close_map()
+            return
+        self.width, self.count = int(header[1]), int(header[2])
+        self._state = (int(header[3]), int(header[4]), header[5].decode("ascii"))
+        if self.count:
+            # mmap can't map an empty file, so an index with no records is never mapped
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _record(self, i):
+        start = self.HEADER_SIZE + i * self.width
+        return self._map[start:start + self.width - 1]
+
+    def _records(self):
+        for i in range(self.count):
+            yield self._record(i).rstrip(b" ")
+
+    def __contains__(self, doc_num):
+        if not doc_num:
+            # Orders without a document number are never recorded
+            return False
+        key = doc_num.encode("utf-8")
+        with self._lock:
+            if not self.count or len(key) >= self.width:
+                return False
+            key = key.ljust(self.width - 1)
+            lo, hi = 0, self.count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._record(mid) < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo < self.count and self._record(lo) == key
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        with self._lock:
+            keys = list(self._records())
+        return (key.decode("utf-8") for key in keys)
+
+    def _recorded_state(self):
+        return self._state
+
+    def _store(self, doc_nums, state, reset=False):
+        # Space padding keeps the padded records in the same order as the plain numbers
+        new = sorted(set(d.encode("utf-8") for d in doc_nums))
+        existing = [] if reset or not self.count else self._records()
+        width = max([self.width] + [len(key) + 1 for key in new])
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        count = 0
+        previous = None
+        with open(tmp_path, "wb") as f:
+            f.write(b"\n".ljust(self.HEADER_SIZE))
+            for key in heapq.merge(existing, new):
+                if key != previous:
+                    f.write(key.ljust(width - 1) + b"\n")
+                    count += 1
+                    previous = key
+            header = b" ".join([self.MAGIC] + [str(n).encode("ascii") for n in (width, count) + tuple(state)])
+            f.seek(0)
+            f.write(header.ljust(self.HEADER_SIZE - 1) + b"\n")
+        self._close_map()
+        os.replace(tmp_path, self.path)
+        self._open()
+
+    def close(self):
+        with self._lock:
+            self._close_map()
+
+DOCUMENT_INDEX_KINDS = {"sqlite": DocumentIndex, "sorted": SortedDocumentIndex}
+_document_index = None
+_document_index_lock = threading.Lock()
+
+def get_document_index():
+    global _document_index
+    with _document_index_lock:
+        if _document_index is None:
+            _document_index = DOCUMENT_INDEX_KINDS[DOCUMENT_INDEX_KIND]()
+        else:
+            _document_index.sync()
+        return _document_index
 
 def load_processed_document_numbers():
-    processed = set()
-    if os.path.exists(CSV_FILE):
-        with open(CSV_FILE, "r", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                doc_num = row.get("document_number")
-                if doc_num:
-                    processed.add(doc_num)
+    # Supports `in` like the set this used to return, but each check is an indexed lookup
+    processed = get_storage().processed_document_numbers()
+    if BLOOM_FILTER_ENABLED:
+        return get_bloom_index(processed)
     return processed
 
-def fetch_executive_orders(start_date):
+# --- Bloom filter prefilter ---
+class BloomFilter:
+    # k bit positions per key from double hashing one BLAKE2b digest
+    def __init__(self, capacity, fp_rate, bits=None, count=0):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.size = max(8, int(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+class BloomFilteredIndex:
+    # Answers `in` from the filter when it can and falls back to the exact index otherwise. The
+    # filter file records which storage it was built from and that storage's index_state(); any
+    # mismatch, or a filter past its capacity, rebuilds it from the exact index, so a rewritten
+    # history can never leave the filter missing a recorded document.
+    def __init__(self, index, path=BLOOM_FILTER_FILE, fp_rate=BLOOM_FP_RATE):
+        self.index = index
+        self.path = path
+        self.fp_rate = fp_rate
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.filtered = 0
+        self.index_state = None
+        self.filter = self._load()
+        if self.filter is None:
+            self._rebuild()
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                meta = json.loads(f.readline())
+                bits = bytearray(f.read())
+        except (OSError, ValueError):
+            return None
+        index_state = self.index.index_state()
+        if (meta.get("source") != STORAGE_BACKEND or meta.get("fp_rate") != self.fp_rate
+                or meta.get("index_state") != index_state):
+            return None
+        bloom = BloomFilter(meta["capacity"], self.fp_rate, bits, meta["count"])
+        if len(bits) != (bloom.size + 7) // 8:
+            return None
+        self.index_state = index_state
+        return bloom
+
+    def _rebuild(self):
+        count = len(self.index)
+        print(f"Building the Bloom filter for {count} recorded document(s).")
+        self.filter = BloomFilter(max(BLOOM_MIN_CAPACITY, 2 * count), self.fp_rate)
+        for doc_num in self.index:
+            self.filter.add(doc_num)
+        self.filter.count = count
+        self._save()
+
+    def _save(self):
+        self.index_state = self.index.index_state()
+        meta = {"source": STORAGE_BACKEND, "fp_rate": self.fp_rate, "index_state": self.index_state,
+                "capacity": self.filter.capacity, "count": self.filter.count}
+        try:
+            write_file_atomic(self.path, json.dumps(meta).encode("utf-8") + b"\n" + bytes(self.filter.bits))
+        except OSError as e:
+            print("Error writing Bloom filter:", e)
+
+    def __contains__(self, doc_num):
+        if not doc_num:
+            # Never recorded, and the filter can only hash strings
+            return False
+        with self._lock:
+            self.lookups += 1
+            if doc_num not in self.filter:
+                self.filtered += 1
+                return False
+        return doc_num in self.index
+
+    def add(self, doc_nums):
+        # Called once the orders are in the exact index; count mirrors its size afterwards
+        with self._lock:
+            for doc_num in doc_nums:
+                self.filter.add(doc_num)
+            self.filter.count = len(self.index)
+            if self.filter.count > self.filter.capacity:
+                self._rebuild()
+            else:
+                self._save()
+
+    def report(self):
+        if self.lookups:
+            print(f"Bloom filter: {self.filtered} of {self.lookups} lookup(s) answered without the index")
+
+_bloom_index = None
+_bloom_index_lock = threading.Lock()
+
+def get_bloom_index(index):
+    global _bloom_index
+    with _bloom_index_lock:
+        if _bloom_index is None or _bloom_index.index is not index:
+            _bloom_index = BloomFilteredIndex(index, fp_rate=BLOOM_FP_RATE)
+        elif _bloom_index.index_state != index.index_state():
+            _bloom_index._rebuild()
+        return _bloom_index
+
+def add_to_bloom_filter(doc_nums):
+    # A filter not loaded in this run is checked against the index size when it next is
+    if _bloom_index is not None:
+        _bloom_index.add([doc_num for doc_num in doc_nums if doc_num])
+
+def report_bloom_filter():
+    if _bloom_index is not None:
+        _bloom_index.report()
+
+# --- Shared HTTP session ---
+_session = None
+_session_lock = threading.Lock()
+
+def create_session(pool_size=HTTP_POOL_SIZE):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session(pool_size=HTTP_POOL_SIZE):
+    # One keep-alive session per process so every request reuses pooled connections. The first
+    # caller sizes the pool; main sizes it for the run's concurrency before anything else runs.
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session(pool_size)
+        return _session
+
+def session_pool_size(workers=DOWNLOAD_WORKERS, shards=1):
+    # Enough connections for the most concurrent phase: XML downloads, or the result pages
+    # fetched by every backfill shard at once
+    return max(HTTP_POOL_SIZE, workers, shards * PAGE_WORKERS)
+
+def http_get(url, params=None, session=None, cache=True, **kwargs):
+    session = session or get_session()
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    if not (cache and HTTP_CACHE_ENABLED) or kwargs.get("stream"):
+        return request_with_retries(session, url, params, **kwargs)
+    key = http_cache_key(url, params)
+    meta = load_http_cache_meta(key)
+    headers = dict(kwargs.pop("headers", None) or {})
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    response = request_with_retries(session, url, params, headers=headers, **kwargs)
+    if response.status_code == 304 and meta:
+        cached = load_http_cache_response(key, meta)
+        if cached is not None:
+            return cached
+        # The body vanished (e.g. evicted meanwhile); fetch it again unconditionally
+        return request_with_retries(session, url, params, **kwargs)
+    if response.status_code == 200:
+        store_http_cache_entry(key, response)
+    return response
+
+# --- Retries, backoff and circuit breaking ---
+class CircuitOpenError(requests.RequestException):
+    pass
+
+_retry_lock = threading.Lock()
+_retries_used = 0
+# host -> [consecutive failures, monotonic time until which the circuit stays open]
+_circuits = {}
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    now = datetime.datetime.now(retry_at.tzinfo)
+    return max(0.0, (retry_at - now).total_seconds())
+
+def backoff_delay(attempt):
+    # Capped exponential backoff with full jitter
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+def retry_delay(attempt, response=None):
+    if response is not None and response.status_code in (429, 503):
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            # Honor the server; if it asks for longer than we are willing to wait, give up
+            return retry_after if retry_after <= RETRY_MAX_DELAY else None
+    return backoff_delay(attempt)
+
+def take_retry_budget():
+    global _retries_used
+    with _retry_lock:
+        if _retries_used >= RETRY_BUDGET:
+            return False
+        _retries_used += 1
+        return True
+
+def check_circuit(host):
+    with _retry_lock:
+        failures, open_until = _circuits.get(host, (0, 0.0))
+        if failures >= CIRCUIT_FAILURE_THRESHOLD and time.monotonic() < open_until:
+            raise CircuitOpenError(f"Circuit open for {host} after {failures} consecutive failures")
+
+def record_host_result(host, ok):
+    with _retry_lock:
+        if ok:
+            _circuits.pop(host, None)
+            return
+        failures, open_until = _circuits.get(host, (0, 0.0))
+        failures += 1
+        if failures >= CIRCUIT_FAILURE_THRESHOLD:
+            # Also re-opens immediately when the trial request after a reset fails
+            open_until = time.monotonic() + CIRCUIT_RESET_SECONDS
+        _circuits[host] = (failures, open_until)
+
+def request_with_retries(session, url, params=None, token_acquired=False, **kwargs):
+    # token_acquired means the caller already took a rate-limit token for the first attempt
+    host = urlsplit(url).netloc
+    attempt = 0
+    while True:
+        check_circuit(host)
+        if attempt or not token_acquired:
+            get_rate_limiter(host).acquire()
+        try:
+            response = session.get(url, params=params, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            record_host_result(host, False)
+            if attempt + 1 >= RETRY_MAX_ATTEMPTS or not take_retry_budget():
+                raise
+            delay = backoff_delay(attempt)
+            print(f"Request to {host} failed ({e}); retrying in {delay:.1f}s")
+        else:
+            if response.status_code not in RETRY_STATUS_CODES:
+                record_host_result(host, True)
+                return response
+            record_host_result(host, False)
+            delay = retry_delay(attempt, response)
+            if delay is None or attempt + 1 >= RETRY_MAX_ATTEMPTS or not take_retry_budget():
+                return response
+            print(f"Request to {host} returned {response.status_code}; retrying in {delay:.1f}s")
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+# --- Client-side rate limiting ---
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.requests = 0
+        self.waits = 0
+        self.waited_seconds = 0.0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        # Takes a token now, going into debt if necessary, and returns how long the caller must wait.
+        # Sleeping happens outside the lock so threads and coroutines can share one bucket.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.requests += 1
+            if delay > 0:
+                self.waits += 1
+                self.waited_seconds += delay
+            return delay
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(host):
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(host)
+        if limiter is None:
+            rate, burst = RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT)
+            limiter = _rate_limiters[host] = TokenBucket(rate, burst)
+        return limiter
+
+def report_rate_limit_waits():
+    with _rate_limiters_lock:
+        limiters = sorted(_rate_limiters.items())
+    for host, limiter in limiters:
+        if limiter.requests:
+            print(f"Rate limiter for {host}: {limiter.requests} request(s), "
+                  f"{limiter.waits} throttled, {limiter.waited_seconds:.1f}s spent waiting")
+
+# --- On-disk HTTP cache ---
+_http_cache_lock = threading.Lock()
+# Running size estimate so stores only rescan the cache when it may be over budget
+_http_cache_size = None
+
+def normalize_url(url, params=None):
+    prepared = requests.Request("GET", url, params=params).prepare()
+    parts = urlsplit(prepared.url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+def http_cache_key(url, params=None):
+    return hashlib.sha256(normalize_url(url, params).encode("utf-8")).hexdigest()
+
+def http_cache_paths(key):
+    return (os.path.join(HTTP_CACHE_DIR, key + ".json"),
+            os.path.join(HTTP_CACHE_DIR, key + ".gz"))
+
+def load_http_cache_meta(key):
+    meta_path, _ = http_cache_paths(key)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load_http_cache_response(key, meta):
+    meta_path, body_path = http_cache_paths(key)
+    try:
+        with open(body_path, "rb") as f:
+            body = gzip.decompress(f.read())
+        # The meta file's mtime doubles as the last-access time for LRU eviction
+        os.utime(meta_path, None)
+    except (OSError, EOFError):
+        return None
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.url = meta.get("url", "")
+    return response
+
+def store_http_cache_entry(key, response):
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        # Without a validator the entry could never be revalidated
+        return
+    meta = {
+        "url": response.url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "headers": {name: response.headers[name] for name in ("Content-Type", "ETag", "Last-Modified")
+                    if name in response.headers},
+    }
+    meta_path, body_path = http_cache_paths(key)
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        compressed = gzip.compress(response.content)
+        with open(body_path + tmp_suffix, "wb") as f:
+            f.write(compressed)
+        with open(meta_path + tmp_suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(body_path + tmp_suffix, body_path)
+        os.replace(meta_path + tmp_suffix, meta_path)
+    except OSError as e:
+        print("Error writing HTTP cache entry:", e)
+        return
+    global _http_cache_size
+    with _http_cache_lock:
+        if _http_cache_size is not None:
+            _http_cache_size += len(compressed)
+        over_budget = _http_cache_size is None or _http_cache_size > HTTP_CACHE_MAX_BYTES
+    if over_budget:
+        evict_http_cache()
+
+def http_cache_entries():
+    entries = []
+    if not os.path.isdir(HTTP_CACHE_DIR):
+        return entries
+    for name in os.listdir(HTTP_CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        key = name[:-len(".json")]
+        meta_path, body_path = http_cache_paths(key)
+        try:
+            size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+            last_access = os.path.getmtime(meta_path)
+        except OSError:
+            continue
+        entries.append((last_access, size, key))
+    return entries
+
+def evict_http_cache(max_bytes=None):
+    global _http_cache_size
+    max_bytes = HTTP_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _http_cache_lock:
+        entries = sorted(http_cache_entries())
+        total = sum(size for _, size, _ in entries)
+        # Drop least recently used entries until the cache fits
+        for _, size, key in entries:
+            if total <= max_bytes:
+                break
+            for path in http_cache_paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        _http_cache_size = total
+
+def http_cache_info():
+    entries = http_cache_entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"HTTP cache directory: {os.path.abspath(HTTP_CACHE_DIR)}")
+    print(f"Entries: {len(entries)}")
+    print(f"Size: {total / 1024 / 1024:.1f} MiB of {HTTP_CACHE_MAX_BYTES / 1024 / 1024:.1f} MiB")
+    windows = 0
+    if os.path.isdir(WINDOW_CACHE_DIR):
+        for _, _, files in os.walk(WINDOW_CACHE_DIR):
+            windows += sum(1 for name in files if name.endswith(".json"))
+    print(f"Cached closed weeks: {windows}")
+
+def purge_http_cache():
+    global _http_cache_size
+    for cache_dir in (HTTP_CACHE_DIR, WINDOW_CACHE_DIR):
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir)
+    _http_cache_size = None
+    print("HTTP cache purged.")
+
+def fetch_results_page(params, page, session=None, **kwargs):
+    page_params = dict(params, page=str(page))
+    try:
+        response = http_get(BASE_API_URL, params=page_params, session=session, **kwargs)
+    except requests.RequestException as e:
+        print(f"Error fetching page {page}:", e)
+        return None
+    if response.status_code == 200:
+        return response.json()
+    print(f"Error fetching page {page}:", response.status_code)
+    return None
+
+def projected_fields():
+    fields = []
+    for field in CSV_COLUMNS + XML_URL_FIELDS:
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+def build_query_params(start_date, end_date=None):
     params = {
-        "per_page": "1000",
+        "per_page": str(PER_PAGE),
         "order": "newest",
         "conditions[publication_date][gte]": start_date,
         "conditions[type][]": "PRESDOCU",
         "conditions[presidential_document_type][]": "executive_order",
         "conditions[president][]": "donald-trump"
     }
-    response = requests.get(BASE_API_URL, params=params)
-    if response.status_code == 200:
-        return response.json().get("results", [])
-    else:
-        print("Error fetching data:", response.status_code)
-        return []
+    if end_date:
+        params["conditions[publication_date][lte]"] = end_date
+    if PROJECT_FIELDS:
+        params["fields[]"] = projected_fields()
+    return params
+
+def fetch_date_range(start_date, end_date=None, session=None):
+    # Returns None when any page fails so callers never act on a partial result set
+    params = build_query_params(start_date, end_date)
+    session = session or get_session()
+    first_page = fetch_results_page(params, 1, session)
+    if first_page is None:
+        return None
+    pages = []
+    total_pages = first_page.get("total_pages") or 1
+    if total_pages > 1:
+        # Remaining pages are fetched concurrently; map() keeps them in page order
+        remaining = range(2, total_pages + 1)
+        with ThreadPoolExecutor(max_workers=min(PAGE_WORKERS, len(remaining))) as executor:
+            pages = list(executor.map(lambda page: fetch_results_page(params, page, session), remaining))
+    return combine_result_pages(first_page, pages)
+
+def combine_result_pages(first_page, pages):
+    # A missing page would let the date watermark skip past its orders, so fail the whole fetch
+    if any(page_data is None for page_data in pages):
+        print("Incomplete result set; discarding this fetch.")
+        return None
+    # Pages of a live result set shift when an order is published between page requests, so the
+    # same order can come back on two pages; keep its first occurrence
+    results = []
+    seen = set()
+    for page_data in [first_page] + list(pages):
+        for order in page_data.get("results", []):
+            doc_num = order.get("document_number")
+            if doc_num is not None and doc_num in seen:
+                continue
+            seen.add(doc_num)
+            results.append(order)
+    if first_page.get("count") is not None and len(results) < first_page["count"]:
+        print(f"Warning: API reported {first_page['count']} orders but returned {len(results)}.")
+    return results
+
+def fetch_orders(start_date, session=None, end_date=None):
+    # Like fetch_executive_orders, but returns None when the fetch failed
+    if WINDOW_CACHE_ENABLED:
+        return fetch_with_window_cache(start_date, end_date, session)
+    return fetch_date_range(start_date, end_date, session)
+
+def fetch_executive_orders(start_date, session=None, end_date=None):
+    results = fetch_orders(start_date, session, end_date)
+    return results if results is not None else []
+
+# --- Date-window cache for closed publication weeks ---
+def parse_date(date_str):
+    return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+
+def week_start(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+def iso_week_windows(start, end):
+    window_start = week_start(start)
+    while window_start <= end:
+        window_end = window_start + datetime.timedelta(days=6)
+        yield window_start, window_end
+        window_start = window_end + datetime.timedelta(days=1)
+
+def window_query_signature():
+    # Everything that shapes the results except the date range itself
+    params = build_query_params("")
+    del params["conditions[publication_date][gte]"]
+    del params["per_page"]
+    return hashlib.sha256(json.dumps(sorted(params.items())).encode("utf-8")).hexdigest()[:16]
+
+def window_cache_path(signature, window_start):
+    year, week, _ = window_start.isocalendar()
+    return os.path.join(WINDOW_CACHE_DIR, signature, f"{year}-W{week:02d}.json")
+
+def read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_file_atomic(path, data):
+    # Unique temp name so concurrent writers of the same file never share a temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def write_json_atomic(path, data):
+    write_file_atomic(path, json.dumps(data).encode("utf-8"))
+
+def load_window(signature, window_start):
+    return read_json(window_cache_path(signature, window_start))
+
+def save_window(signature, window_start, orders):
+    try:
+        write_json_atomic(window_cache_path(signature, window_start), orders)
+    except OSError as e:
+        print("Error writing window cache:", e)
+
+class WindowFetchPlan:
+    # Works out which date ranges still need querying; callers run the queries (sync or async)
+    # and hand the results back through add_results.
+    def __init__(self, start_date, end_date=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        start = parse_date(start_date)
+        today = datetime.date.today()
+        self.end = parse_date(end_date) if end_date else today
+        # Windows ending before this date are treated as immutable
+        self.closed_before = today - datetime.timedelta(days=WINDOW_GRACE_DAYS)
+        self.signature = window_query_signature()
+        self.undated = []
+        windows = list(iso_week_windows(start, self.end))
+        self.by_window = {}
+        for window_start, window_end in windows:
+            if window_end < self.closed_before:
+                orders = load_window(self.signature, window_start)
+                if orders is not None:
+                    self.by_window[window_start] = orders
+        # Group consecutive uncached windows so each gap costs a single query
+        gaps = []
+        for window in windows:
+            if window[0] in self.by_window:
+                continue
+            if gaps and gaps[-1][-1][1] + datetime.timedelta(days=1) == window[0]:
+                gaps[-1].append(window)
+            else:
+                gaps.append([window])
+        self.queries = []
+        for gap in gaps:
+            gap_start, gap_end = gap[0][0], gap[-1][1]
+            closable = gap[0][1] < self.closed_before
+            # Closed windows are fetched whole so they can be cached; open ones only from start_date
+            query_start = gap_start if closable else max(gap_start, start)
+            query_end = None if (end_date is None and gap_end >= today) else min(gap_end, self.end)
+            self.queries.append((gap, query_start.isoformat(), query_end and query_end.isoformat()))
+
+    def add_results(self, gap, fetched):
+        buckets = {window_start: [] for window_start, _ in gap}
+        for order in fetched:
+            try:
+                buckets.setdefault(week_start(parse_date(order.get("publication_date", ""))), []).append(order)
+            except ValueError:
+                self.undated.append(order)
+        for window_start, window_end in gap:
+            if window_end < self.closed_before and window_end <= self.end:
+                save_window(self.signature, window_start, buckets[window_start])
+        self.by_window.update(buckets)
+
+    def results(self):
+        results = []
+        for window_start in sorted(self.by_window, reverse=True):
+            for order in self.by_window[window_start]:
+                pub_date = order.get("publication_date", "")
+                if pub_date >= self.start_date and (self.end_date is None or pub_date <= self.end_date):
+                    results.append(order)
+        return results + self.undated
+
+def fetch_with_window_cache(start_date, end_date=None, session=None):
+    plan = WindowFetchPlan(start_date, end_date)
+    for gap, query_start, query_end in plan.queries:
+        fetched = fetch_date_range(query_start, query_end, session)
+        if fetched is None:
+            return None
+        plan.add_results(gap, fetched)
+    return plan.results()
+
+# --- Streaming JSON parsing of API results ---
+_json_decoder = json.JSONDecoder()
+
+def iter_json_results(chunks, meta=None):
+    # Yields the elements of the top-level "results" array one at a time from a byte stream;
+    # every other top-level key is stored in meta. Only one element is held in memory at once.
+    meta = {} if meta is None else meta
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    state = {"buf": "", "pos": 0, "eof": False}
+
+    def fill():
+        if state["eof"]:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            state["eof"] = True
+            text = decoder.decode(b"", final=True)
+        else:
+            text = decoder.decode(chunk)
+        # Drop what has already been consumed before growing the buffer
+        state["buf"] = state["buf"][state["pos"]:] + text
+        state["pos"] = 0
+        return True
+
+    def peek():
+        while True:
+            buf, pos = state["buf"], state["pos"]
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            state["pos"] = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(char):
+        if peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON stream at offset {state['pos']}")
+        state["pos"] += 1
+
+    def value():
+        peek()
+        while True:
+            try:
+                obj, end = _json_decoder.raw_decode(state["buf"], state["pos"])
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # A number cut by a chunk boundary ("15" of "1500.0") decodes fine but is incomplete,
+            # so only accept a value once the character after it is visible
+            if (end == len(state["buf"]) or state["buf"][end] not in ",:]} \t\r\n") and fill():
+                continue
+            state["pos"] = end
+            return obj
+
+    expect("{")
+    while peek() != "}":
+        if peek() == ",":
+            state["pos"] += 1
+        key = value()
+        expect(":")
+        if key != "results":
+            meta[key] = value()
+            continue
+        expect("[")
+        while peek() != "]":
+            if peek() == ",":
+                state["pos"] += 1
+            yield value()
+        state["pos"] += 1
+    state["pos"] += 1
+
+def iter_results_page(params, page, session, meta):
+    page_params = dict(params, page=str(page))
+    response = http_get(BASE_API_URL, params=page_params, session=session, stream=True)
+    with response:
+        if response.status_code != 200:
+            raise requests.HTTPError(f"Error fetching page {page}: {response.status_code}", response=response)
+        for order in iter_json_results(response.iter_content(STREAM_CHUNK_SIZE), meta):
+            yield order
+
+def iter_executive_orders(start_date, session=None, end_date=None):
+    # Streaming counterpart of fetch_executive_orders: pages are read one after another and
+    # orders are yielded as they are parsed. Raises on failure instead of returning partial results.
+    params = build_query_params(start_date, end_date)
+    session = session or get_session()
+    # Like combine_result_pages, orders repeated on a later page of a shifting result set are dropped;
+    # only their document numbers are kept
+    meta = {}
+    seen = set()
+    for order in iter_results_page(params, 1, session, meta):
+        seen.add(order.get("document_number"))
+        yield order
+    for page in range(2, (meta.get("total_pages") or 1) + 1):
+        for order in iter_results_page(params, page, session, {}):
+            doc_num = order.get("document_number")
+            if doc_num is not None and doc_num in seen:
+                continue
+            seen.add(doc_num)
+            yield order
 
 def process_order(order):
     # Only extract the required fields
@@ -68,24 +1220,231 @@ def process_order(order):
     }
 
 def update_csv_and_date(orders):
-    if not orders:
-        print("No new executive orders found.")
-        return
-    rows = [process_order(order) for order in orders]
-    file_exists = os.path.exists(CSV_FILE)
-    with open(CSV_FILE, "a", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS)
-        if not file_exists:
-            writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
-    # Update last date based on the maximum publication_date among orders
-    max_date = max(
-        [datetime.datetime.strptime(o.get("publication_date", "1900-01-01"), "%Y-%m-%d").date()
-         for o in orders if o.get("publication_date")]
-    )
-    set_start_date(max_date.strftime("%Y-%m-%d"))
-    print(f"Recorded {len(rows)} new executive order(s). Last publication date updated to {max_date}.")
+    # Records orders and advances the last publication date with the configured storage backend
+    get_storage().record_orders(orders)
+    add_to_bloom_filter(order.get("document_number") for order in orders or [])
+
+def stream_orders_to_storage(orders):
+    # Records each order as it arrives and returns what save_order_txt needs for each one
+    pending = get_storage().stream_orders(orders)
+    add_to_bloom_filter(order["document_number"] for order in pending)
+    return pending
+
+def report_recorded(recorded, old_cursor, new_cursor):
+    if new_cursor == old_cursor:
+        print(f"Recorded {recorded} new executive order(s). Last publication date left at {new_cursor.date}.")
+    else:
+        print(f"Recorded {recorded} new executive order(s). Last publication date updated to {new_cursor.date}.")
+
+# --- Storage backends ---
+class CsvStorage:
+    # Appends to CSV_FILE. LAST_DATE_FILE holds the last publication date on its first line and
+    # the document numbers recorded on that date on the following ones.
+    def get_cursor(self):
+        if os.path.exists(LAST_DATE_FILE):
+            with open(LAST_DATE_FILE, "r") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            if lines:
+                return FetchCursor(lines[0], lines[1:])
+        return FetchCursor(DEFAULT_START_DATE)
+
+    def set_cursor(self, cursor):
+        with open(LAST_DATE_FILE, "w") as f:
+            f.write("\n".join([cursor.date] + sorted(cursor.seen)))
+
+    def processed_document_numbers(self):
+        return get_document_index()
+
+    def record_orders(self, orders):
+        if not orders:
+            print("No new executive orders found.")
+            return
+        rows = [process_order(order) for order in orders]
+        file_exists = os.path.exists(CSV_FILE)
+        with open(CSV_FILE, "a", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS)
+            if not file_exists:
+                writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+        get_document_index().add(row["document_number"] for row in rows)
+        self.advance_cursor(rows, len(rows))
+
+    def advance_cursor(self, orders, recorded):
+        cursor = self.get_cursor()
+        new_cursor = cursor.advanced(orders)
+        if new_cursor != cursor:
+            self.set_cursor(new_cursor)
+        report_recorded(recorded, cursor, new_cursor)
+
+    def stream_orders(self, orders):
+        # Writes each order as soon as it arrives and keeps only what save_order_txt needs.
+        # The watermark is only advanced once the whole stream was consumed successfully; a failed
+        # stream truncates the CSV back to where it started, so its orders are fetched again.
+        pending = []
+        file_exists = os.path.exists(CSV_FILE)
+        original = os.stat(CSV_FILE) if file_exists else None
+        try:
+            with open(CSV_FILE, "a", newline="", encoding="utf-8") as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS)
+                if not file_exists:
+                    writer.writeheader()
+                for order in orders:
+                    writer.writerow(process_order(order))
+                    pending.append({"document_number": order.get("document_number", ""),
+                                    "publication_date": order.get("publication_date", "")})
+        except BaseException:
+            if original is None:
+                os.remove(CSV_FILE)
+            else:
+                os.truncate(CSV_FILE, original.st_size)
+                # Restoring the mtime keeps the document index from treating the CSV as rewritten
+                os.utime(CSV_FILE, ns=(original.st_atime_ns, original.st_mtime_ns))
+            raise
+        get_document_index().add(order["document_number"] for order in pending)
+        if not pending:
+            print("No new executive orders found.")
+        else:
+            self.advance_cursor(pending, len(pending))
+        return pending
+
+class SqliteStorage:
+    # Orders and the last publication date live in one SQLite database in WAL mode, so readers
+    # such as dashboards never see a half-written row while the checker writes. Each run's
+    # orders and the new watermark are committed together in a single transaction.
+    def __init__(self, path=SQLITE_DB_FILE):
+        self.path = path
+        # Reentrant: a streamed run checks membership while its own insert transaction is open
+        self._lock = threading.RLock()
+        is_new = not os.path.exists(path)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{column} TEXT" + (" PRIMARY KEY" if column == "document_number" else "")
+                            for column in CSV_COLUMNS)
+        with self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS orders ({columns})")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS orders_publication_date ON orders (publication_date)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)")
+        if is_new:
+            self._import_csv_history()
+
+    def _import_csv_history(self):
+        # Carries an existing CSV history and watermark over the first time the database is used
+        csv_storage = CsvStorage()
+        rows = []
+        if os.path.exists(CSV_FILE):
+            with open(CSV_FILE, "r", encoding="utf-8", newline="") as csvfile:
+                rows = [row for row in csv.DictReader(csvfile) if row.get("document_number")]
+        with self._lock, self._conn:
+            self._insert(rows)
+            if os.path.exists(LAST_DATE_FILE):
+                self._write_cursor(csv_storage.get_cursor())
+        if rows:
+            print(f"Imported {len(rows)} order(s) from {CSV_FILE} into {self.path}.")
+
+    def _insert(self, rows):
+        placeholders = ", ".join("?" for _ in CSV_COLUMNS)
+        self._conn.executemany(f"INSERT OR IGNORE INTO orders ({', '.join(CSV_COLUMNS)}) VALUES ({placeholders})",
+                               ([row.get(column, "") for column in CSV_COLUMNS] for row in rows))
+        # Bumped by every write so caches derived from the orders can tell they are stale. No
+        # upsert: ON CONFLICT ... DO UPDATE needs SQLite 3.24.
+        self._conn.execute("INSERT OR IGNORE INTO state VALUES ('generation', '0')")
+        self._conn.execute("UPDATE state SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'")
+
+    def index_state(self):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE key = 'generation'").fetchone()
+        return [int(row[0]) if row else 0]
+
+    def _read_cursor(self):
+        state = dict(self._conn.execute(
+            "SELECT key, value FROM state WHERE key IN ('last_eo_date', 'boundary_documents')"))
+        if "last_eo_date" not in state:
+            return FetchCursor(DEFAULT_START_DATE)
+        return FetchCursor(state["last_eo_date"], json.loads(state.get("boundary_documents", "[]")))
+
+    def _write_cursor(self, cursor):
+        self._conn.executemany("INSERT OR REPLACE INTO state VALUES (?, ?)",
+                               [("last_eo_date", cursor.date), ("boundary_documents", json.dumps(sorted(cursor.seen)))])
+
+    def _advance_cursor(self, orders):
+        # Read and written inside the caller's transaction, together with the orders themselves
+        cursor = self._read_cursor()
+        new_cursor = cursor.advanced(orders)
+        if new_cursor != cursor:
+            self._write_cursor(new_cursor)
+        return cursor, new_cursor
+
+    def get_cursor(self):
+        with self._lock:
+            return self._read_cursor()
+
+    def set_cursor(self, cursor):
+        with self._lock, self._conn:
+            self._write_cursor(cursor)
+
+    def processed_document_numbers(self):
+        return self
+
+    def __contains__(self, doc_num):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM orders WHERE document_number = ?", (doc_num,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def __iter__(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT document_number FROM orders").fetchall()
+        return (row[0] for row in rows)
+
+    def record_orders(self, orders):
+        if not orders:
+            print("No new executive orders found.")
+            return
+        rows = [process_order(order) for order in orders]
+        with self._lock, self._conn:
+            self._insert(rows)
+            cursor, new_cursor = self._advance_cursor(rows)
+        report_recorded(len(rows), cursor, new_cursor)
+
+    def stream_orders(self, orders):
+        # Rows are inserted as they arrive but only committed, with the watermark, at the end;
+        # a failed stream rolls back, so the next run fetches the same orders again.
+        pending = []
+
+        def rows():
+            for order in orders:
+                pending.append({"document_number": order.get("document_number", ""),
+                                "publication_date": order.get("publication_date", "")})
+                yield process_order(order)
+
+        with self._lock, self._conn:
+            self._insert(rows())
+            cursor, new_cursor = self._advance_cursor(pending)
+        if not pending:
+            print("No new executive orders found.")
+        else:
+            report_recorded(len(pending), cursor, new_cursor)
+        return pending
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+STORAGE_BACKENDS = {"csv": CsvStorage, "sqlite": SqliteStorage}
+_storage = None
+_storage_lock = threading.Lock()
+
+def get_storage():
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = STORAGE_BACKENDS[STORAGE_BACKEND]()
+        return _storage
 
 def generate_xml_url(publication_date, document_number):
     try:
@@ -99,61 +1458,1109 @@ def generate_xml_url(publication_date, document_number):
         return None
 
 # --- XML to plain text conversion functions ---
+def iter_element_lines(elem):
+    # Yields the stripped, non-empty text and tail fragments of elem's subtree in document
+    # order: an element's text, then each child's subtree followed by that child's tail.
+    # itertext() walks the tree iteratively in C, so nothing is recursed into or copied per
+    # level and deep nesting cannot hit the recursion limit.
+    for text in elem.itertext():
+        text = text.strip()
+        if text:
+            yield text
+
 def element_to_lines(elem):
+    return list(iter_element_lines(elem))
+
+def use_lxml():
+    return lxml_etree is not None and XML_BACKEND != "stdlib"
+
+# lxml parsers and XPath evaluators must not be shared between threads
+_lxml_local = threading.local()
+
+def lxml_helpers():
+    helpers = getattr(_lxml_local, "helpers", None)
+    if helpers is None:
+        # Configured to build the same tree as ElementTree: comments and processing instructions
+        # are dropped. The XPath returns plain strings, which is faster than itertext() on lxml.
+        helpers = _lxml_local.helpers = {
+            "parser": lxml_etree.XMLParser(remove_comments=True, remove_pis=True, huge_tree=True),
+            "utf8_parser": lxml_etree.XMLParser(remove_comments=True, remove_pis=True, huge_tree=True,
+                                                encoding="utf-8"),
+            "text_nodes": lxml_etree.XPath("//text()", smart_strings=False),
+        }
+    return helpers
+
+def lxml_to_plain_text(xml_content):
+    helpers = lxml_helpers()
+    if isinstance(xml_content, str):
+        # lxml refuses str input that carries an encoding declaration, so re-encode and override it
+        root = lxml_etree.fromstring(xml_content.encode("utf-8"), helpers["utf8_parser"])
+    else:
+        root = lxml_etree.fromstring(bytes(xml_content), helpers["parser"])
     lines = []
-    if elem.text and elem.text.strip():
-        lines.append(elem.text.strip())
-    for child in elem:
-        lines.extend(element_to_lines(child))
-        if child.tail and child.tail.strip():
-            lines.append(child.tail.strip())
-    return lines
+    for text in helpers["text_nodes"](root):
+        text = text.strip()
+        if text:
+            lines.append(text)
+    return "\n".join(lines)
 
 def xml_to_plain_text(xml_content):
+    # Prefer raw bytes (bytes, bytearray or memoryview): the parser then decodes exactly once,
+    # as the XML declaration says. str is still accepted for existing callers.
+    if isinstance(xml_content, memoryview) and not xml_content.contiguous:
+        xml_content = xml_content.tobytes()
+    if use_lxml():
+        try:
+            return lxml_to_plain_text(xml_content)
+        except lxml_etree.XMLSyntaxError:
+            # libxml2 caps nesting depth and words some errors differently; ElementTree decides
+            pass
     try:
         root = ET.fromstring(xml_content)
     except ET.ParseError as e:
         print("XML parse error:", e)
         return ""
-    lines = element_to_lines(root)
-    filtered = [line for line in lines if line]
-    return "\n".join(filtered)
+    return "\n".join(iter_element_lines(root))
+
+# --- Structured outputs: Markdown and a JSON section tree ---
+class BlockTarget:
+    # Parser target grouping a document into blocks: headings, paragraphs, signature lines and
+    # tables. Everything inside a block element, inline children included, is joined into one
+    # whitespace-normalized string, with INLINE_MARKERS around each child's text. Loose text
+    # becomes one paragraph per fragment.
+    def __init__(self):
+        self.blocks = []
+        self._depth = 0
+        self._capture = None  # (depth, tag, attrib) of the element whose text is being collected
+        self._table = None
+        self._table_depth = 0
+        self._data = []
+
+    def _text(self):
+        text = " ".join("".join(self._data).split())
+        self._data = []
+        return text
+
+    def _flush_loose(self):
+        if not self._data:
+            return
+        text = self._text()
+        if not text:
+            return
+        if self._table is not None:
+            self._table["notes"].append(text)
+        else:
+            self.blocks.append({"type": "paragraph", "text": text})
+
+    def _finish_capture(self):
+        _, tag, attrib = self._capture
+        self._capture = None
+        text = self._text()
+        if self._table is not None:
+            # Empty cells are kept so columns stay aligned
+            if tag == "CHED":
+                self._table["header"].append(text)
+            elif tag == "ENT":
+                if not self._table["rows"]:
+                    self._table["rows"].append([])
+                self._table["rows"][-1].append(text)
+            elif text:
+                self._table["title"] = text
+        elif not text:
+            return
+        elif tag in HEADING_TAGS:
+            level = HEADING_LEVELS.get(attrib.get("SOURCE"), DEFAULT_HEADING_LEVEL)
+            self.blocks.append({"type": "heading", "level": level, "text": text})
+        elif tag in SIGNATURE_TAGS:
+            if self.blocks and self.blocks[-1]["type"] == "signature":
+                self.blocks[-1]["lines"].append(text)
+            else:
+                self.blocks.append({"type": "signature", "lines": [text]})
+        else:
+            self.blocks.append({"type": "paragraph", "text": text})
+
+    def start(self, tag, attrib, *args):
+        self._depth += 1
+        if self._capture is not None:
+            self._data.append(INLINE_MARKERS.get(tag, DEFAULT_INLINE_MARKER)[0])
+            return
+        self._flush_loose()
+        if self._table is not None:
+            if tag == "ROW":
+                self._table["rows"].append([])
+            elif tag in ("CHED", "ENT", "TTITLE"):
+                self._capture = (self._depth, tag, attrib)
+        elif tag == TABLE_TAG:
+            self._table = {"type": "table", "title": "", "header": [], "rows": [], "notes": []}
+            self._table_depth = self._depth
+        elif tag in HEADING_TAGS or tag in PARAGRAPH_TAGS or tag in SIGNATURE_TAGS:
+            self._capture = (self._depth, tag, attrib)
+
+    def end(self, tag):
+        if self._capture is not None:
+            if self._capture[0] == self._depth:
+                self._finish_capture()
+            else:
+                self._data.append(INLINE_MARKERS.get(tag, DEFAULT_INLINE_MARKER)[1])
+        else:
+            self._flush_loose()
+            if self._table is not None and self._table_depth == self._depth:
+                self.blocks.append(self._table)
+                self._table = None
+        self._depth -= 1
+
+    def data(self, data):
+        self._data.append(data)
+
+    def close(self):
+        self._flush_loose()
+
+class FanoutTarget:
+    # Forwards one parser's callbacks to several targets, so N outputs cost a single parse
+    def __init__(self, targets):
+        self.targets = targets
+
+    def start(self, tag, attrib, *args):
+        for target in self.targets:
+            target.start(tag, attrib)
+
+    def end(self, tag):
+        for target in self.targets:
+            target.end(tag)
+
+    def data(self, data):
+        for target in self.targets:
+            target.data(data)
+
+    def close(self):
+        for target in self.targets:
+            target.close()
+
+def markdown_table(table):
+    header, rows = table["header"], table["rows"]
+    if not header and rows:
+        header, rows = rows[0], rows[1:]
+    width = max(len(row) for row in [header] + rows)
+    lines = []
+    if table["title"]:
+        lines += ["**" + table["title"] + "**", ""]
+    if width:
+        for i, row in enumerate([header] + rows):
+            cells = [cell.replace("|", "\\|") for cell in row] + [""] * (width - len(row))
+            lines.append("| " + " | ".join(cells) + " |")
+            if i == 0:
+                lines.append("|" + " --- |" * width)
+    for note in table["notes"]:
+        lines += ["", note]
+    return "\n".join(lines).strip()
+
+def render_markdown(blocks):
+    parts = []
+    for block in blocks:
+        if block["type"] == "heading":
+            parts.append("#" * block["level"] + " " + block["text"])
+        elif block["type"] == "signature":
+            # Backslash line breaks keep the signature lines together in one paragraph
+            parts.append("\\\n".join(block["lines"]))
+        elif block["type"] == "table":
+            parts.append(markdown_table(block))
+        else:
+            parts.append(block["text"])
+    return "\n\n".join(part for part in parts if part)
+
+def build_section_tree(blocks):
+    # Each heading opens a section that holds the blocks up to the next heading of the same
+    # or a higher level; deeper headings become nested sections
+    root = {"blocks": [], "sections": []}
+    stack = [(0, root)]
+    for block in blocks:
+        if block["type"] != "heading":
+            stack[-1][1]["blocks"].append(block)
+            continue
+        while stack[-1][0] >= block["level"]:
+            stack.pop()
+        section = {"heading": block["text"], "level": block["level"], "blocks": [], "sections": []}
+        stack[-1][1]["sections"].append(section)
+        stack.append((block["level"], section))
+    return root
+
+def render_formats(lines, blocks, formats):
+    outputs = {}
+    if "txt" in formats:
+        outputs["txt"] = "\n".join(lines)
+    if "md" in formats:
+        outputs["md"] = render_markdown(blocks)
+    if "json" in formats:
+        # Compact, like the repo's other JSON files: indent= drops json to its pure-Python encoder
+        outputs["json"] = json.dumps(build_section_tree(blocks), ensure_ascii=False)
+    return outputs
+
+def render_outputs(xml_content, formats=None):
+    # Returns {format: content} for every requested format from one parse of the document.
+    # Plain text on its own keeps the tree-based path, which can use lxml.
+    formats = formats or OUTPUT_FORMATS
+    if tuple(formats) == ("txt",):
+        return {"txt": xml_to_plain_text(xml_content)}
+    if isinstance(xml_content, memoryview):
+        xml_content = xml_content.tobytes()
+    text_target = TextFragmentTarget()
+    block_target = BlockTarget()
+    targets = [text_target, block_target] if "txt" in formats else [block_target]
+    parser = ET.XMLParser(target=FanoutTarget(targets) if len(targets) > 1 else block_target)
+    try:
+        parser.feed(xml_content)
+        parser.close()
+    except ET.ParseError as e:
+        # Like xml_to_plain_text, a document that cannot be parsed yields empty outputs
+        print("XML parse error:", e)
+        text_target.lines = []
+        block_target.blocks = []
+    return render_formats(text_target.lines, block_target.blocks, formats)
+
+# --- Conversion manifest ---
+def xml_digest(xml_content):
+    return hashlib.sha256(xml_content).hexdigest()
+
+class ConversionManifest:
+    # Maps document number -> {"sha256", "converter", "outputs": {format: path}}. Shared by the
+    # download threads, so every access holds the lock.
+    def __init__(self, path=CONVERSION_MANIFEST_FILE):
+        self.path = path
+        self.entries = read_json(path) or {}
+        self._lock = threading.Lock()
+        self._unsaved = 0
+
+    def is_current(self, doc_num, digest, formats=None):
+        # True when this exact XML was already converted by this converter version into every
+        # requested format, and those files are still on disk
+        with self._lock:
+            entry = self.entries.get(doc_num)
+        if not entry or entry.get("sha256") != digest or entry.get("converter") != CONVERTER_VERSION:
+            return False
+        outputs = entry.get("outputs", {})
+        return all(fmt in outputs and os.path.exists(outputs[fmt]) for fmt in formats or OUTPUT_FORMATS)
+
+    def record(self, doc_num, digest, paths):
+        outputs = {os.path.splitext(path)[1][1:]: path for path in paths}
+        with self._lock:
+            self.entries[doc_num] = {"sha256": digest, "converter": CONVERTER_VERSION, "outputs": outputs}
+            self._unsaved += 1
+            due = self._unsaved >= MANIFEST_SAVE_EVERY
+        if due:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            if not self._unsaved:
+                return
+            entries = dict(self.entries)
+            self._unsaved = 0
+        try:
+            write_json_atomic(self.path, entries)
+        except OSError as e:
+            print("Error writing conversion manifest:", e)
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+def get_conversion_manifest():
+    # None when the manifest is disabled, so every caller converts unconditionally
+    global _manifest
+    if not CONVERSION_MANIFEST_ENABLED:
+        return None
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = ConversionManifest()
+        return _manifest
+
+def save_conversion_manifest():
+    if _manifest is not None:
+        _manifest.save()
+
+def conversion_is_current(doc_num, digest):
+    manifest = get_conversion_manifest()
+    if FORCE_RECONVERT or manifest is None or not manifest.is_current(doc_num, digest):
+        return False
+    print(f"Document {doc_num} is unchanged since it was last converted; skipping.")
+    return True
+
+def record_conversion(doc_num, digest, paths):
+    manifest = get_conversion_manifest()
+    if manifest is not None:
+        manifest.record(doc_num, digest, paths)
+
+# --- Raw XML archive ---
+def archive_object_path(digest):
+    return os.path.join(XML_ARCHIVE_DIR, "objects", digest[:2], digest + ".xml.gz")
+
+def archive_ref_path(doc_num):
+    return os.path.join(XML_ARCHIVE_DIR, "refs", doc_num)
+
+def gzip_bytes(data):
+    # gzip.compress only takes mtime from Python 3.8 on
+    buffer = io.BytesIO()
+    with gzip.GzipFile(filename="", mode="wb", fileobj=buffer, mtime=0) as f:
+        f.write(data)
+    return buffer.getvalue()
+
+def archive_xml(doc_num, xml_content, digest):
+    # Identical XML is stored once; mtime=0 keeps the compressed bytes reproducible
+    if not XML_ARCHIVE_ENABLED:
+        return
+    try:
+        object_path = archive_object_path(digest)
+        if not os.path.exists(object_path):
+            write_file_atomic(object_path, gzip_bytes(xml_content))
+        write_file_atomic(archive_ref_path(doc_num), digest.encode("ascii"))
+    except OSError as e:
+        print(f"Error archiving XML for document {doc_num}:", e)
+
+def archived_documents():
+    # (document_number, object path) for every archived document, sorted by document number
+    refs_dir = os.path.join(XML_ARCHIVE_DIR, "refs")
+    if not os.path.isdir(refs_dir):
+        return []
+    documents = []
+    for doc_num in sorted(os.listdir(refs_dir)):
+        if doc_num.endswith(".tmp"):
+            continue
+        with open(os.path.join(refs_dir, doc_num), "r", encoding="ascii") as f:
+            object_path = archive_object_path(f.read().strip())
+        if os.path.exists(object_path):
+            documents.append((doc_num, object_path))
+        else:
+            print(f"Archived XML for document {doc_num} is missing: {object_path}")
+    return documents
+
+def read_archived_xml(path):
+    with open(path, "rb") as f:
+        return gzip.decompress(f.read())
+
+# --- Multiprocess XML conversion ---
+def init_conversion_worker(backend=None, formats=None):
+    # Spawned workers don't inherit main()'s settings, so they are passed in explicitly.
+    # Import and exercise the parser once so the first real task doesn't pay for it.
+    global XML_BACKEND, OUTPUT_FORMATS
+    if backend is not None:
+        XML_BACKEND = backend
+    if formats is not None:
+        OUTPUT_FORMATS = formats
+    render_outputs(b"<warmup/>")
+
+def create_conversion_pool(processes=CONVERT_PROCESSES):
+    # Workers are forked when the pool is created; create it before starting any threads
+    return multiprocessing.Pool(processes, initializer=init_conversion_worker,
+                                initargs=(XML_BACKEND, OUTPUT_FORMATS))
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def convert_xml_files(paths, processes=CONVERT_PROCESSES, chunksize=CONVERT_CHUNKSIZE, pool=None):
+    documents = [(os.path.basename(path).split(".")[0], path) for path in paths]
+    return convert_xml_documents(documents, read_bytes, processes, chunksize, pool)
+
+def convert_xml_documents(documents, read=read_bytes, processes=CONVERT_PROCESSES,
+                          chunksize=CONVERT_CHUNKSIZE, pool=None, force=False):
+    # documents is a list of (document_number, source); read(source) returns the raw XML.
+    # Raw bytes go to the workers and rendered outputs come back; element trees never cross processes.
+    # Files are submitted in bounded batches so the whole corpus is never held in memory.
+    # Unless forced, documents whose outputs are current according to the manifest are not submitted.
+    batch_size = max(1, processes * chunksize * 2)
+    converted = 0
+    own_pool = pool is None
+    pool = pool or create_conversion_pool(processes)
+    try:
+        for batch_start in range(0, len(documents), batch_size):
+            pending = []
+            for doc_num, source in documents[batch_start:batch_start + batch_size]:
+                xml_content = read(source)
+                digest = xml_digest(xml_content)
+                if force or not conversion_is_current(doc_num, digest):
+                    pending.append((doc_num, digest, xml_content))
+            rendered = pool.imap(render_outputs, (xml_content for _, _, xml_content in pending), chunksize)
+            for (doc_num, digest, _), outputs in zip(pending, rendered):
+                record_conversion(doc_num, digest, write_order_outputs(doc_num, outputs))
+                converted += 1
+    finally:
+        if own_pool:
+            pool.close()
+            pool.join()
+    return converted
+
+def run_convert(source_dir, processes=CONVERT_PROCESSES, chunksize=CONVERT_CHUNKSIZE):
+    if not os.path.isdir(source_dir):
+        print("No such directory:", source_dir)
+        return 1
+    paths = sorted(os.path.join(source_dir, name) for name in os.listdir(source_dir) if name.endswith(".xml"))
+    if not paths:
+        print("No XML files found in", source_dir)
+        return 0
+    print(f"Converting {len(paths)} XML file(s) with {processes} process(es).")
+    converted = convert_xml_files(paths, processes, chunksize)
+    print(f"Converted {converted} XML file(s), {len(paths) - converted} unchanged, into {', '.join(output_dir(fmt) for fmt in OUTPUT_FORMATS)}.")
+    return 0
 
-def save_order_txt(order):
+def run_rerender(processes=CONVERT_PROCESSES, chunksize=CONVERT_CHUNKSIZE):
+    # Rebuilds every output from the local XML archive without touching the network. Always
+    # converts, so runs over the same archive are directly comparable as benchmarks.
+    documents = archived_documents()
+    if not documents:
+        print("No archived XML found in", XML_ARCHIVE_DIR)
+        return 0
+    print(f"Re-rendering {len(documents)} archived document(s) with {processes} process(es).")
+    started = time.perf_counter()
+    converted = convert_xml_documents(documents, read_archived_xml, processes, chunksize, force=True)
+    elapsed = time.perf_counter() - started
+    rate = converted / elapsed if elapsed else 0.0
+    print(f"Re-rendered {converted} document(s) into {', '.join(output_dir(fmt) for fmt in OUTPUT_FORMATS)} "
+          f"in {elapsed:.2f}s ({rate:.1f} documents/s).")
+    return 0
+
+def order_xml_url(order):
     pub_date = order.get("publication_date", "")
     doc_num = order.get("document_number", "")
     if not pub_date or not doc_num:
         print("Missing publication_date or document_number for order", order.get("document_number", "unknown"))
-        return
+        return None
     xml_url = generate_xml_url(pub_date, doc_num)
     if not xml_url:
         print("Could not generate XML URL for order", doc_num)
-        return
-    response = requests.get(xml_url)
-    if response.status_code == 200:
-        xml_content = response.text
-        plain_text = xml_to_plain_text(xml_content)
-        output_dir = "executive_order_txt"
-        os.makedirs(output_dir, exist_ok=True)
-        file_path = os.path.join(output_dir, f"{doc_num}.txt")
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(plain_text)
-        print(f"Saved plain text for document {doc_num} to {file_path}")
-    else:
+    return xml_url
+
+def download_order_xml(order, session=None, **kwargs):
+    # Returns the order's full-text XML as undecoded bytes, or None (after reporting why) if it
+    # is unavailable. Decoding is left to the XML parser, which honors the document's declaration.
+    xml_url = order_xml_url(order)
+    if not xml_url:
+        return None
+    try:
+        response = http_get(xml_url, session=session, **kwargs)
+    except requests.RequestException as e:
+        print(f"Error fetching XML from {xml_url}:", e)
+        return None
+    if response.status_code != 200:
         print(f"Error fetching XML from {xml_url}: {response.status_code}")
+        return None
+    return response.content
+
+FORMAT_LABELS = {"txt": "plain text", "md": "Markdown", "json": "JSON sections"}
+
+def output_dir(fmt):
+    return {"txt": TXT_OUTPUT_DIR, "md": MD_OUTPUT_DIR, "json": JSON_OUTPUT_DIR}[fmt]
+
+def write_order_output(doc_num, fmt, content):
+    directory = output_dir(fmt)
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, f"{doc_num}.{fmt}")
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"Saved {FORMAT_LABELS[fmt]} for document {doc_num} to {file_path}")
+    return file_path
+
+def write_order_outputs(doc_num, outputs):
+    return [write_order_output(doc_num, fmt, content) for fmt, content in outputs.items()]
+
+def save_order_txt(order, session=None):
+    # Writes every format in OUTPUT_FORMATS; streaming only pays off when plain text is wanted
+    if STREAM_XML and "txt" in OUTPUT_FORMATS:
+        return save_order_txt_streaming(order, session)
+    xml_content = download_order_xml(order, session)
+    if xml_content is None:
+        return False
+    doc_num = order["document_number"]
+    digest = xml_digest(xml_content)
+    archive_xml(doc_num, xml_content, digest)
+    if not conversion_is_current(doc_num, digest):
+        record_conversion(doc_num, digest, write_order_outputs(doc_num, render_outputs(xml_content)))
+    return True
+
+# --- Streaming XML conversion ---
+class TextFragmentTarget:
+    # Parser target producing the same fragments as iter_element_lines without building a tree.
+    # Character data is buffered until the next tag: data before a child's start tag or the
+    # element's end tag is the element's text, data after an end tag is that element's tail.
+    def __init__(self):
+        self.lines = []
+        self._data = []
+
+    def _flush(self):
+        if self._data:
+            text = "".join(self._data).strip()
+            self._data = []
+            if text:
+                self.lines.append(text)
+
+    def start(self, tag, attrib, *args):
+        self._flush()
 
-def main():
-    start_date = get_start_date()
+    def end(self, tag):
+        self._flush()
+
+    def data(self, data):
+        self._data.append(data)
+
+    def close(self):
+        self._flush()
+
+def iter_hashed_chunks(chunks, hasher, archive_file=None):
+    # archive_file, when given, receives a compressed copy of the document as it streams past
+    for chunk in chunks:
+        hasher.update(chunk)
+        if archive_file is not None:
+            archive_file.write(chunk)
+        yield chunk
+
+def archive_streamed_xml(doc_num, tmp_path, digest):
+    # Moves a document compressed while streaming into place; it is only kept if it is new
+    try:
+        object_path = archive_object_path(digest)
+        if os.path.exists(object_path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(tmp_path, object_path)
+        write_file_atomic(archive_ref_path(doc_num), digest.encode("ascii"))
+    except OSError as e:
+        print(f"Error archiving XML for document {doc_num}:", e)
+
+def iter_xml_stream_lines(chunks, block_target=None):
+    # Yields lines while the document is still arriving; memory stays flat regardless of size.
+    # Always uses expat: with Python-level target callbacks it outpaces lxml's feed parser.
+    # A BlockTarget passed in is fed by the same parse for the structured outputs.
+    target = TextFragmentTarget()
+    parser = ET.XMLParser(target=FanoutTarget([target, block_target]) if block_target else target)
+    for chunk in chunks:
+        parser.feed(chunk)
+        lines, target.lines = target.lines, []
+        for line in lines:
+            yield line
+    parser.close()
+    for line in target.lines:
+        yield line
+
+def write_order_txt_stream(doc_num, chunks, block_target=None):
+    os.makedirs(TXT_OUTPUT_DIR, exist_ok=True)
+    file_path = os.path.join(TXT_OUTPUT_DIR, f"{doc_num}.txt")
+    tmp_path = file_path + ".part"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            try:
+                separator = ""
+                for line in iter_xml_stream_lines(chunks, block_target):
+                    f.write(separator)
+                    f.write(line)
+                    separator = "\n"
+            except ET.ParseError as e:
+                # Match xml_to_plain_text, which yields an empty document on parse errors
+                print("XML parse error:", e)
+                f.seek(0)
+                f.truncate()
+                if block_target is not None:
+                    block_target.blocks = []
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    print(f"Saved plain text for document {doc_num} to {file_path}")
+    return file_path
+
+def save_order_txt_streaming(order, session=None):
+    xml_url = order_xml_url(order)
+    if not xml_url:
+        return False
+    doc_num = order["document_number"]
+    try:
+        response = http_get(xml_url, session=session, stream=True)
+        with response:
+            if response.status_code != 200:
+                print(f"Error fetching XML from {xml_url}: {response.status_code}")
+                return False
+            structured = [fmt for fmt in OUTPUT_FORMATS if fmt != "txt"]
+            block_target = BlockTarget() if structured else None
+            # The hash is only known once the document has been converted, so streaming always
+            # rewrites its outputs; recording it still lets buffered runs skip the document later.
+            hasher = hashlib.sha256()
+            archive_tmp = archive_file = None
+            if XML_ARCHIVE_ENABLED:
+                os.makedirs(XML_ARCHIVE_DIR, exist_ok=True)
+                archive_tmp = os.path.join(XML_ARCHIVE_DIR, f"{doc_num}.{os.getpid()}.{threading.get_ident()}.tmp")
+                archive_raw = open(archive_tmp, "wb")
+                # Keep the temp file's name and mtime out of the gzip header
+                archive_file = gzip.GzipFile(filename="", mode="wb", fileobj=archive_raw, mtime=0)
+            try:
+                chunks = iter_hashed_chunks(response.iter_content(STREAM_CHUNK_SIZE), hasher, archive_file)
+                paths = [write_order_txt_stream(doc_num, chunks, block_target)]
+            except BaseException:
+                if archive_file is not None:
+                    archive_file.close()
+                    archive_raw.close()
+                    os.remove(archive_tmp)
+                raise
+            if archive_file is not None:
+                archive_file.close()
+                archive_raw.close()
+    except requests.RequestException as e:
+        print(f"Error fetching XML from {xml_url}:", e)
+        return False
+    if archive_tmp:
+        archive_streamed_xml(doc_num, archive_tmp, hasher.hexdigest())
+    if block_target is not None:
+        paths += write_order_outputs(doc_num, render_formats([], block_target.blocks, structured))
+    record_conversion(doc_num, hasher.hexdigest(), paths)
+    return True
+
+def save_order_txt_isolated(order, session=None):
+    # One document's unexpected failure must not take down the rest of the batch
+    try:
+        return save_order_txt(order, session)
+    except Exception as e:
+        print(f"Error saving plain text for document {order.get('document_number', 'unknown')}:", e)
+        return False
+
+def save_orders_txt(orders, session=None, workers=DOWNLOAD_WORKERS):
+    # Results are returned in the same order as orders, whatever order the work finished in
+    if workers <= 1 or len(orders) <= 1:
+        return [save_order_txt_isolated(order, session) for order in orders]
+    with ThreadPoolExecutor(max_workers=min(workers, len(orders))) as executor:
+        return list(executor.map(lambda order: save_order_txt_isolated(order, session), orders))
+
+def report_failed_saves(orders, results):
+    failed = [order.get("document_number", "unknown") for order, ok in zip(orders, results) if not ok]
+    if failed:
+        print(f"Failed to save plain text for {len(failed)} order(s): {', '.join(failed)}")
+    return 1 if failed else 0
+
+def check_for_new_orders(session, workers=DOWNLOAD_WORKERS):
+    cursor = get_fetch_cursor()
+    start_date = cursor.query_start_date()
     print("Fetching executive orders published on or after:", start_date)
-    orders = fetch_executive_orders(start_date)
+    orders = fetch_orders(start_date, session)
+    if orders is None:
+        print("Fetching executive orders failed; nothing was recorded.")
+        return 1
     processed_docs = load_processed_document_numbers()
-    new_orders = [o for o in orders if o.get("document_number") not in processed_docs]
+    new_orders = [o for o in orders if is_new_order(o, cursor, processed_docs)]
     if not new_orders:
         print("No new executive orders to process.")
-    else:
-        update_csv_and_date(new_orders)
-        for order in new_orders:
-            save_order_txt(order)
+        return 0
+    update_csv_and_date(new_orders)
+    results = save_orders_txt(new_orders, session, workers)
+    return report_failed_saves(new_orders, results)
+
+def check_for_new_orders_streaming(session, workers=DOWNLOAD_WORKERS):
+    cursor = get_fetch_cursor()
+    start_date = cursor.query_start_date()
+    print("Streaming executive orders published on or after:", start_date)
+    processed_docs = load_processed_document_numbers()
+    orders = iter_executive_orders(start_date, session)
+    try:
+        new_orders = stream_orders_to_storage(o for o in orders if is_new_order(o, cursor, processed_docs))
+    except (requests.RequestException, ValueError) as e:
+        # Nothing was recorded: the storage rolled back and the watermark was not moved
+        print("Streaming executive orders failed:", e)
+        return 1
+    results = save_orders_txt(new_orders, session, workers)
+    return report_failed_saves(new_orders, results)
+
+# --- asyncio engine ---
+async def run_in_thread(func, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+async def throttled_call(url, semaphore, func, *args, **kwargs):
+    # Waits for the rate limiter on the event loop, then runs the blocking request in a thread
+    async with semaphore:
+        await get_rate_limiter(urlsplit(url).netloc).acquire_async()
+        return await run_in_thread(func, *args, token_acquired=True, **kwargs)
+
+async def fetch_date_range_async(start_date, end_date, session, semaphore):
+    params = build_query_params(start_date, end_date)
+    first_page = await throttled_call(BASE_API_URL, semaphore, fetch_results_page, params, 1, session)
+    if first_page is None:
+        return None
+    total_pages = first_page.get("total_pages") or 1
+    pages = await asyncio.gather(*(
+        throttled_call(BASE_API_URL, semaphore, fetch_results_page, params, page, session)
+        for page in range(2, total_pages + 1)
+    ))
+    return combine_result_pages(first_page, list(pages))
+
+async def fetch_orders_async(start_date, session, semaphore):
+    if not WINDOW_CACHE_ENABLED:
+        return await fetch_date_range_async(start_date, None, session, semaphore)
+    plan = await run_in_thread(WindowFetchPlan, start_date)
+    fetched = await asyncio.gather(*(
+        fetch_date_range_async(query_start, query_end, session, semaphore)
+        for _, query_start, query_end in plan.queries
+    ))
+    if any(results is None for results in fetched):
+        return None
+    for (gap, _, _), results in zip(plan.queries, fetched):
+        plan.add_results(gap, results)
+    return plan.results()
+
+async def save_order_txt_async(order, session, semaphore, parse_executor):
+    url = generate_xml_url(order.get("publication_date", ""), order.get("document_number", "")) or BASE_API_URL
+    xml_content = await throttled_call(url, semaphore, download_order_xml, order, session)
+    if xml_content is None:
+        return False
+    doc_num = order["document_number"]
+    digest = xml_digest(xml_content)
+    await run_in_thread(archive_xml, doc_num, xml_content, digest)
+    if conversion_is_current(doc_num, digest):
+        return True
+    loop = asyncio.get_running_loop()
+    # Parsing is CPU-bound; keep it off the event loop so downloads keep overlapping
+    outputs = await loop.run_in_executor(parse_executor, render_outputs, xml_content)
+    paths = await run_in_thread(write_order_outputs, doc_num, outputs)
+    record_conversion(doc_num, digest, paths)
+    return True
+
+async def check_for_new_orders_async(session, workers=DOWNLOAD_WORKERS):
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=workers))
+    semaphore = asyncio.Semaphore(workers)
+    cursor = await run_in_thread(get_fetch_cursor)
+    start_date = cursor.query_start_date()
+    print("Fetching executive orders published on or after:", start_date)
+    orders = await fetch_orders_async(start_date, session, semaphore)
+    if orders is None:
+        print("Fetching executive orders failed; nothing was recorded.")
+        return 1
+    processed_docs = await run_in_thread(load_processed_document_numbers)
+    new_orders = [o for o in orders if is_new_order(o, cursor, processed_docs)]
+    if not new_orders:
+        print("No new executive orders to process.")
+        return 0
+    update_csv_and_date(new_orders)
+    with ThreadPoolExecutor(max_workers=1) as parse_executor:
+        results = await asyncio.gather(*(
+            save_order_txt_async(order, session, semaphore, parse_executor) for order in new_orders
+        ))
+    return report_failed_saves(new_orders, results)
+
+# --- Pipelined engine: download threads -> conversion processes -> writer thread ---
+_PIPELINE_DONE = object()
+
+class MeteredQueue(queue.Queue):
+    # A bounded queue that records how full it ran, to show which stage is the bottleneck
+    def __init__(self, name, maxsize):
+        super().__init__(maxsize)
+        self.name = name
+        self.items = 0
+        self.max_depth = 0
+        self.depth_total = 0
+        self.blocked_puts = 0
+
+    def put(self, item, block=True, timeout=None):
+        if self.full():
+            self.blocked_puts += 1
+        super().put(item, block, timeout)
+
+    def _put(self, item):
+        # Called with the queue's mutex held
+        super()._put(item)
+        if item is _PIPELINE_DONE:
+            return
+        depth = self._qsize()
+        self.items += 1
+        self.depth_total += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def report(self):
+        mean_depth = self.depth_total / self.items if self.items else 0.0
+        print(f"Pipeline queue {self.name}: {self.items} item(s), max depth {self.max_depth}/{self.maxsize}, "
+              f"mean depth {mean_depth:.1f}, producer blocked {self.blocked_puts} time(s)")
+
+def run_pipeline(orders, session, workers=DOWNLOAD_WORKERS, processes=CONVERT_PROCESSES,
+                 queue_size=PIPELINE_QUEUE_SIZE):
+    # Returns one success flag per order, in order. The process pool is created before any
+    # stage thread starts so forked workers never inherit a lock held by another thread.
+    results = [False] * len(orders)
+    download_queue = MeteredQueue("download", queue_size)
+    convert_queue = MeteredQueue("convert", queue_size)
+    write_queue = MeteredQueue("write", queue_size)
+
+    def download_stage():
+        while True:
+            item = download_queue.get()
+            if item is _PIPELINE_DONE:
+                return
+            index, order = item
+            try:
+                xml_content = download_order_xml(order, session)
+            except Exception as e:
+                print(f"Error downloading document {order.get('document_number', 'unknown')}:", e)
+                continue
+            if xml_content is None:
+                continue
+            doc_num = order["document_number"]
+            digest = xml_digest(xml_content)
+            archive_xml(doc_num, xml_content, digest)
+            if conversion_is_current(doc_num, digest):
+                results[index] = True
+            else:
+                convert_queue.put((index, doc_num, digest, xml_content))
+
+    def convert_stage(pool):
+        # Each converter thread keeps exactly one task in flight, bounding work in the pool
+        while True:
+            item = convert_queue.get()
+            if item is _PIPELINE_DONE:
+                return
+            index, doc_num, digest, xml_content = item
+            try:
+                outputs = pool.apply(render_outputs, (xml_content,))
+            except Exception as e:
+                print(f"Error converting document {doc_num}:", e)
+                continue
+            write_queue.put((index, doc_num, digest, outputs))
+
+    def write_stage():
+        while True:
+            item = write_queue.get()
+            if item is _PIPELINE_DONE:
+                return
+            index, doc_num, digest, outputs = item
+            try:
+                record_conversion(doc_num, digest, write_order_outputs(doc_num, outputs))
+                results[index] = True
+            except Exception as e:
+                print(f"Error writing plain text for document {doc_num}:", e)
+
+    with create_conversion_pool(processes) as pool:
+        downloaders = [threading.Thread(target=download_stage, daemon=True) for _ in range(workers)]
+        converters = [threading.Thread(target=convert_stage, args=(pool,), daemon=True) for _ in range(processes)]
+        writer = threading.Thread(target=write_stage, daemon=True)
+        for thread in downloaders + converters + [writer]:
+            thread.start()
+        for index, order in enumerate(orders):
+            download_queue.put((index, order))
+        # Shut stages down in order so each drains its input before the next one stops
+        for stage_queue, threads in ((download_queue, downloaders), (convert_queue, converters),
+                                     (write_queue, [writer])):
+            for _ in threads:
+                stage_queue.put(_PIPELINE_DONE)
+            for thread in threads:
+                thread.join()
+    for stage_queue in (download_queue, convert_queue, write_queue):
+        stage_queue.report()
+    return results
+
+def check_for_new_orders_pipeline(session, workers=DOWNLOAD_WORKERS, processes=CONVERT_PROCESSES):
+    cursor = get_fetch_cursor()
+    start_date = cursor.query_start_date()
+    print("Fetching executive orders published on or after:", start_date)
+    orders = fetch_orders(start_date, session)
+    if orders is None:
+        print("Fetching executive orders failed; nothing was recorded.")
+        return 1
+    processed_docs = load_processed_document_numbers()
+    new_orders = [o for o in orders if is_new_order(o, cursor, processed_docs)]
+    if not new_orders:
+        print("No new executive orders to process.")
+        return 0
+    update_csv_and_date(new_orders)
+    results = run_pipeline(new_orders, session, workers, processes)
+    return report_failed_saves(new_orders, results)
+
+# --- Date-sharded backfill ---
+def split_date_range(start, end, shards):
+    total_days = (end - start).days + 1
+    shards = max(1, min(shards, total_days))
+    base, extra = divmod(total_days, shards)
+    ranges = []
+    shard_start = start
+    for i in range(shards):
+        shard_end = shard_start + datetime.timedelta(days=base + (1 if i < extra else 0) - 1)
+        ranges.append((shard_start, shard_end))
+        shard_start = shard_end + datetime.timedelta(days=1)
+    return ranges
+
+def shard_checkpoint_paths(shard_start, shard_end):
+    base = os.path.join(BACKFILL_CHECKPOINT_DIR, f"{shard_start}_{shard_end}")
+    # Fetched orders, and an append-only log of document numbers whose text was saved
+    return base + ".json", base + ".saved"
+
+def backfill_shard(shard_start, shard_end, processed, session):
+    orders_path, saved_path = shard_checkpoint_paths(shard_start, shard_end)
+    orders = read_json(orders_path)
+    if orders is None:
+        orders = fetch_orders(shard_start.isoformat(), session, end_date=shard_end.isoformat())
+        if orders is None:
+            print(f"Shard {shard_start} to {shard_end}: fetch failed.")
+            return None
+        orders = [o for o in orders if o.get("document_number") not in processed]
+        write_json_atomic(orders_path, orders)
+    saved = set()
+    if os.path.exists(saved_path):
+        with open(saved_path, "r", encoding="utf-8") as f:
+            saved = set(line.strip() for line in f if line.strip())
+    failed = []
+    with open(saved_path, "a", encoding="utf-8") as saved_log:
+        for order in orders:
+            doc_num = order.get("document_number", "")
+            if doc_num in saved:
+                continue
+            if save_order_txt(order, session):
+                saved_log.write(doc_num + "\n")
+                saved_log.flush()
+            else:
+                failed.append(doc_num or "unknown")
+    print(f"Shard {shard_start} to {shard_end}: {len(orders)} new order(s), {len(failed)} failed.")
+    return orders, failed
+
+def run_backfill(start, end, shards, session):
+    if end < start:
+        print("Backfill end date is before its start date.")
+        return 1
+    shard_ranges = split_date_range(start, end, shards)
+    print(f"Backfilling {start} to {end} in {len(shard_ranges)} shard(s).")
+    processed = load_processed_document_numbers()
+    with ThreadPoolExecutor(max_workers=len(shard_ranges)) as executor:
+        results = list(executor.map(lambda r: backfill_shard(r[0], r[1], processed, session), shard_ranges))
+    if any(result is None for result in results):
+        print("Backfill incomplete; completed shards are checkpointed and will be reused on the next run.")
+        return 1
+    # Reload in case an earlier, interrupted backfill already merged some of these orders
+    processed = load_processed_document_numbers()
+    merged = {}
+    for orders, _ in results:
+        for order in orders:
+            doc_num = order.get("document_number")
+            if doc_num not in processed:
+                merged.setdefault(doc_num, order)
+    new_orders = sorted(merged.values(),
+                        key=lambda o: (o.get("publication_date", ""), o.get("document_number", "")))
+    update_csv_and_date(new_orders)
+    failed = [doc_num for _, shard_failed in results for doc_num in shard_failed]
+    if failed:
+        print(f"Failed to save plain text for {len(failed)} order(s): {', '.join(failed)}")
+        print("Checkpoints kept; re-run the same backfill to retry them.")
+        return 1
+    for shard_start, shard_end in shard_ranges:
+        for path in shard_checkpoint_paths(shard_start, shard_end):
+            if os.path.exists(path):
+                os.remove(path)
+    return 0
+
+def parse_formats(value):
+    formats = tuple(dict.fromkeys(fmt.strip() for fmt in value.split(",") if fmt.strip()))
+    if not formats or any(fmt not in OUTPUT_FORMAT_CHOICES for fmt in formats):
+        raise argparse.ArgumentTypeError(f"expected a comma-separated list of {', '.join(OUTPUT_FORMAT_CHOICES)}")
+    return formats
+
+def parse_fp_rate(value):
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = None
+    if rate is None or not 0 < rate < 1:
+        raise argparse.ArgumentTypeError("expected a number between 0 and 1")
+    return rate
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch new executive orders from the Federal Register.")
+    parser.add_argument("--storage", choices=sorted(STORAGE_BACKENDS), default=STORAGE_BACKEND,
+                        help=f"where orders and the last publication date are recorded (default: {STORAGE_BACKEND})")
+    parser.add_argument("--document-index", choices=sorted(DOCUMENT_INDEX_KINDS), default=DOCUMENT_INDEX_KIND,
+                        help="index of recorded document numbers for the csv storage; sorted keeps it a flat "
+                             f"file searched through mmap (default: {DOCUMENT_INDEX_KIND})")
+    parser.add_argument("--bloom-filter", action="store_true",
+                        help=f"check a persisted Bloom filter ({BLOOM_FILTER_FILE}) before the document index")
+    parser.add_argument("--bloom-fp-rate", type=parse_fp_rate, default=BLOOM_FP_RATE,
+                        help=f"false-positive rate the Bloom filter is sized for (default: {BLOOM_FP_RATE})")
+    parser.add_argument("--no-http-cache", action="store_true",
+                        help="bypass the on-disk HTTP and date-window caches for this run")
+    parser.add_argument("--engine", choices=["sync", "async", "pipeline"], default="sync",
+                        help="execution engine for the run command (default: sync)")
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS,
+                        help=f"concurrent XML downloads and conversions (default: {DOWNLOAD_WORKERS}; 1 = serial)")
+    parser.add_argument("--processes", type=int, default=CONVERT_PROCESSES,
+                        help=f"XML conversion processes for the pipeline engine and convert (default: {CONVERT_PROCESSES})")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse API results incrementally to keep memory flat (sync engine; bypasses the caches)")
+    parser.add_argument("--xml-backend", choices=["auto", "lxml", "stdlib"], default=XML_BACKEND,
+                        help="XML parser for conversion; auto uses lxml when it is installed")
+    parser.add_argument("--formats", type=parse_formats, default=OUTPUT_FORMATS,
+                        help="comma-separated outputs to write per document: txt, md, json (default: txt)")
+    parser.add_argument("--reconvert", action="store_true",
+                        help="convert every document even if the conversion manifest says it is unchanged")
+    parser.add_argument("--archive-xml", action="store_true",
+                        help=f"keep downloaded XML, compressed and content-addressed, in {XML_ARCHIVE_DIR}")
+    parser.add_argument("--stream-xml", action="store_true",
+                        help="convert XML while it downloads, writing lines as elements close (sync engine)")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("run", help="fetch and record new orders (default)")
+    convert_parser = subparsers.add_parser("convert", help="convert a directory of XML files to plain text")
+    convert_parser.add_argument("source_dir", help="directory containing <document_number>.xml files")
+    convert_parser.add_argument("--chunksize", type=int, default=CONVERT_CHUNKSIZE,
+                                help=f"documents per conversion task (default: {CONVERT_CHUNKSIZE})")
+    rerender_parser = subparsers.add_parser("rerender", help="rebuild all outputs from the XML archive, offline")
+    rerender_parser.add_argument("--chunksize", type=int, default=CONVERT_CHUNKSIZE,
+                                 help=f"documents per conversion task (default: {CONVERT_CHUNKSIZE})")
+    backfill_parser = subparsers.add_parser("backfill", help="fetch a date range in parallel shards")
+    backfill_parser.add_argument("--from", dest="from_date", type=parse_date,
+                                 default=parse_date(DEFAULT_START_DATE), help="first publication date (YYYY-MM-DD)")
+    backfill_parser.add_argument("--to", dest="to_date", type=parse_date,
+                                 default=datetime.date.today(), help="last publication date (YYYY-MM-DD)")
+    backfill_parser.add_argument("--shards", type=int, default=4, help="number of parallel date shards")
+    cache_parser = subparsers.add_parser("cache", help="inspect or purge the on-disk HTTP cache")
+    cache_parser.add_argument("action", choices=["info", "purge"])
+    args = parser.parse_args(argv)
+    if args.stream and args.engine != "sync":
+        parser.error(f"--stream is only supported by the sync engine, not --engine {args.engine}")
+    return args
+
+def main(argv=None):
+    global HTTP_CACHE_ENABLED, WINDOW_CACHE_ENABLED, STREAM_XML, XML_BACKEND, OUTPUT_FORMATS
+    global FORCE_RECONVERT, XML_ARCHIVE_ENABLED, STORAGE_BACKEND, DOCUMENT_INDEX_KIND
+    global BLOOM_FILTER_ENABLED, BLOOM_FP_RATE
+    args = parse_args(argv)
+    BLOOM_FILTER_ENABLED = args.bloom_filter
+    BLOOM_FP_RATE = args.bloom_fp_rate
+    STORAGE_BACKEND = args.storage
+    DOCUMENT_INDEX_KIND = args.document_index
+    STREAM_XML = args.stream_xml
+    OUTPUT_FORMATS = args.formats
+    XML_BACKEND = args.xml_backend
+    if XML_BACKEND == "lxml" and lxml_etree is None:
+        print("lxml is not installed; falling back to the standard library XML parser.")
+    if args.no_http_cache:
+        HTTP_CACHE_ENABLED = False
+        WINDOW_CACHE_ENABLED = False
+    if args.reconvert:
+        FORCE_RECONVERT = True
+    XML_ARCHIVE_ENABLED = XML_ARCHIVE_ENABLED or args.archive_xml
+    if args.command == "cache":
+        if args.action == "purge":
+            purge_http_cache()
+        else:
+            http_cache_info()
+        return 0
+    try:
+        if args.command == "convert":
+            return run_convert(args.source_dir, max(1, args.processes), max(1, args.chunksize))
+        if args.command == "rerender":
+            return run_rerender(max(1, args.processes), max(1, args.chunksize))
+        shards = args.shards if args.command == "backfill" else 1
+        get_session(session_pool_size(max(1, args.workers), shards))
+        if args.command == "backfill":
+            status = run_backfill(args.from_date, args.to_date, args.shards, get_session())
+        elif args.engine == "async":
+            status = asyncio.run(check_for_new_orders_async(get_session(), max(1, args.workers)))
+        elif args.engine == "pipeline":
+            status = check_for_new_orders_pipeline(get_session(), max(1, args.workers), max(1, args.processes))
+        elif args.stream:
+            status = check_for_new_orders_streaming(get_session(), args.workers)
+        else:
+            status = check_for_new_orders(get_session(), args.workers)
+    finally:
+        save_conversion_manifest()
+    report_rate_limit_waits()
+    report_bloom_filter()
+    return status
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT, "tests", "fixtures")
+
+def load_checker():
+    # eo-checker.py isn't importable by name, so load it from its path once per test run
+    module = sys.modules.get("eo_checker")
+    if module is not None:
+        return module
+    try:
+        import requests  # noqa: F401
+    except ImportError:
+        raise unittest.SkipTest("requests is not installed")
+    spec = importlib.util.spec_from_file_location("eo_checker", os.path.join(ROOT, "eo-checker.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["eo_checker"] = module
+    spec.loader.exec_module(module)
+    return module
+
+def fixture_names():
+    return sorted(name[:-len(".xml")] for name in os.listdir(os.path.join(FIXTURES_DIR, "xml"))
+                  if name.endswith(".xml"))
+
+def read_fixture_xml(name):
+    with open(os.path.join(FIXTURES_DIR, "xml", name + ".xml"), "rb") as f:
+        return f.read()
+
+def read_expected_text(name, fmt="txt"):
+    with open(os.path.join(FIXTURES_DIR, fmt, name + "." + fmt), "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+def reset_state(eo):
+    # Drops the storage and indexes the checker caches for the run
+    for name in ("_bloom_index", "_document_index", "_storage"):
+        obj = getattr(eo, name)
+        if hasattr(obj, "close"):
+            obj.close()
+        setattr(eo, name, None)
+
+def use_temp_workdir(test):
+    # The checker keeps its state files in the working directory, so each test that records
+    # orders runs in a fresh one with fresh singletons
+    eo = load_checker()
+    tmp = tempfile.TemporaryDirectory()
+    cwd = os.getcwd()
+    test.addCleanup(tmp.cleanup)
+    test.addCleanup(os.chdir, cwd)
+    test.addCleanup(reset_state, eo)
+    os.chdir(tmp.name)
+    reset_state(eo)
+    return tmp.name
@@ -0,0 +1,82 @@
+import contextlib
+import io
+import re
+import unittest
+
+from support import fixture_names, load_checker, read_fixture_xml
+
+eo = load_checker()
+
+MALFORMED = {"malformed", "malformed_truncated"}
+
+def declared_encoding(xml_content):
+    if xml_content.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    match = re.match(rb'<\?xml[^>]*encoding="([^"]+)"', xml_content)
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+def input_variants(xml_content):
+    # Every input type xml_to_plain_text accepts, all carrying the same document
+    yield "bytes", xml_content
+    yield "bytearray", bytearray(xml_content)
+    yield "memoryview", memoryview(xml_content)
+    # Non-contiguous: every other byte of the document doubled up
+    yield "strided memoryview", memoryview(bytes(b for byte in xml_content for b in (byte, byte)))[::2]
+    yield "str", xml_content.decode(declared_encoding(xml_content))
+
+def convert(xml_content, backend):
+    previous = eo.XML_BACKEND
+    eo.XML_BACKEND = backend
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return eo.xml_to_plain_text(xml_content)
+    finally:
+        eo.XML_BACKEND = previous
+
+class InputTypesTest(unittest.TestCase):
+    def test_input_types_match_bytes(self):
+        for name in fixture_names():
+            xml_content = read_fixture_xml(name)
+            expected = convert(xml_content, "stdlib")
+            for label, variant in input_variants(xml_content):
+                with self.subTest(name, input=label):
+                    self.assertEqual(convert(variant, "stdlib"), expected)
+
+@unittest.skipIf(eo.lxml_etree is None, "lxml is not installed")
+class LxmlConformanceTest(unittest.TestCase):
+    def test_lxml_matches_stdlib(self):
+        for name in fixture_names():
+            xml_content = read_fixture_xml(name)
+            for label, variant in input_variants(xml_content):
+                with self.subTest(name, input=label):
+                    self.assertEqual(convert(variant, "lxml"), convert(variant, "stdlib"))
+
+    def test_nesting_beyond_libxml2_limit_falls_back(self):
+        depth = 5000
+        xml_content = ("<DOC>" + "<N>x" * depth + "</N>" * depth + "</DOC>").encode("ascii")
+        self.assertEqual(convert(xml_content, "lxml"), convert(xml_content, "stdlib"))
+
+class StreamingConformanceTest(unittest.TestCase):
+    def stream(self, xml_content, chunk_size):
+        chunks = (xml_content[i:i + chunk_size] for i in range(0, len(xml_content), chunk_size))
+        return "\n".join(eo.iter_xml_stream_lines(chunks))
+
+    def test_streaming_matches_buffered(self):
+        for name in fixture_names():
+            if name in MALFORMED:
+                continue
+            xml_content = read_fixture_xml(name)
+            expected = convert(xml_content, "stdlib")
+            for chunk_size in (1, 7, 4096):
+                with self.subTest(name, chunk_size=chunk_size):
+                    self.assertEqual(self.stream(xml_content, chunk_size), expected)
+
+    def test_streaming_raises_on_malformed_input(self):
+        # write_order_txt_stream turns this into the empty document buffered conversion returns
+        for name in sorted(MALFORMED):
+            with self.subTest(name), self.assertRaises(eo.ET.ParseError):
+                self.stream(read_fixture_xml(name), 16)
+            self.assertEqual(convert(read_fixture_xml(name), "stdlib"), "")
+
+if __name__ == "__main__":
+    unittest.main()
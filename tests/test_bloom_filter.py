@@ -0,0 +1,45 @@
+import contextlib
+import io
+import unittest
+
+from support import load_checker, reset_state, use_temp_workdir
+
+eo = load_checker()
+
+class BloomFilterInvalidationTest(unittest.TestCase):
+    # The filter must follow the index even when the CSV is rewritten with as many orders as before
+    def setUp(self):
+        use_temp_workdir(self)
+        saved = {name: getattr(eo, name) for name in ("STORAGE_BACKEND", "DOCUMENT_INDEX_KIND", "BLOOM_FILTER_ENABLED")}
+        self.addCleanup(lambda: [setattr(eo, name, value) for name, value in saved.items()])
+        eo.STORAGE_BACKEND = "csv"
+        eo.BLOOM_FILTER_ENABLED = True
+
+    def write_csv(self, doc_nums):
+        with open(eo.CSV_FILE, "w", encoding="utf-8", newline="") as f:
+            f.write(",".join(eo.CSV_COLUMNS) + "\n")
+            for doc_num in doc_nums:
+                f.write(f"{doc_num},Order {doc_num},2025-01-20,,\n")
+
+    def processed(self):
+        # A fresh run: nothing is cached in memory, only the files on disk
+        reset_state(eo)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return eo.load_processed_document_numbers()
+
+    def test_same_count_rewrite(self):
+        for kind in eo.DOCUMENT_INDEX_KINDS:
+            with self.subTest(kind=kind):
+                eo.DOCUMENT_INDEX_KIND = kind
+                self.write_csv(["2025-01901", "2025-01902"])
+                processed = self.processed()
+                self.assertIn("2025-01901", processed)
+                self.assertEqual(processed.filter.count, 2)
+                self.write_csv(["2025-01903", "2025-01904"])
+                processed = self.processed()
+                self.assertIn("2025-01903", processed)
+                self.assertIn("2025-01904", processed)
+                self.assertNotIn("2025-01901", processed)
+
+if __name__ == "__main__":
+    unittest.main()
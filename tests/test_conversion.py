@@ -0,0 +1,54 @@
+import contextlib
+import io
+import unittest
+
+from support import fixture_names, load_checker, read_expected_text, read_fixture_xml
+
+eo = load_checker()
+
+class PinnedOutputTest(unittest.TestCase):
+    # fixtures/txt holds the output of the original recursive element_to_lines for every
+    # document in fixtures/xml. Any change here changes what users get, so bump
+    # CONVERTER_VERSION along with the pinned files.
+    def setUp(self):
+        self._backend = eo.XML_BACKEND
+        eo.XML_BACKEND = "stdlib"
+
+    def tearDown(self):
+        eo.XML_BACKEND = self._backend
+
+    def test_matches_pinned_output(self):
+        for name in fixture_names():
+            with self.subTest(name), contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(eo.xml_to_plain_text(read_fixture_xml(name)), read_expected_text(name))
+
+    def test_element_to_lines_matches_iterator(self):
+        root = eo.ET.fromstring(read_fixture_xml("eo_basic"))
+        self.assertEqual(eo.element_to_lines(root), list(eo.iter_element_lines(root)))
+
+    def test_nesting_beyond_recursion_limit(self):
+        depth = 5000
+        xml_content = ("<DOC>" + "<N>x" * depth + "</N>y" * depth + "</DOC>").encode("ascii")
+        self.assertEqual(eo.xml_to_plain_text(xml_content), "\n".join(["x"] * depth + ["y"] * depth))
+
+class PinnedStructuredOutputTest(unittest.TestCase):
+    # fixtures/md and fixtures/json hold the Markdown and JSON outputs for every document in
+    # fixtures/xml; like the plain text, they change only with CONVERTER_VERSION
+    def render(self, name):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return eo.render_outputs(read_fixture_xml(name), ("md", "json"))
+
+    def test_matches_pinned_output(self):
+        for name in fixture_names():
+            with self.subTest(name):
+                outputs = self.render(name)
+                self.assertEqual(outputs["md"], read_expected_text(name, "md"))
+                self.assertEqual(outputs["json"], read_expected_text(name, "json"))
+
+    def test_inline_children_are_separated(self):
+        self.assertIn("January 20, 2021[^1] (Ensuring", self.render("eo_basic")["md"])
+        self.assertIn("Sec. 2. Revocation", self.render("eo_basic")["md"])
+        self.assertIn('"Rate (percent)"', self.render("eo_table")["json"])
+
+if __name__ == "__main__":
+    unittest.main()
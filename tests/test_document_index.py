@@ -0,0 +1,75 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from support import load_checker, use_temp_workdir
+
+class CsvIndexSyncTest(unittest.TestCase):
+    # Both index kinds must pick up rows appended to the CSV, and rebuild when indexed rows changed
+    def setUp(self):
+        self.eo = load_checker()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.csv_path = os.path.join(self.tmp.name, "executive_orders.csv")
+
+    def write_csv(self, doc_nums, mode="w"):
+        with open(self.csv_path, mode, encoding="utf-8", newline="") as f:
+            if mode == "w":
+                f.write("document_number,title\n")
+            for doc_num in doc_nums:
+                f.write(f"{doc_num},Order {doc_num}\n")
+
+    def open_index(self, kind):
+        path = os.path.join(self.tmp.name, "index." + kind)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.eo.DOCUMENT_INDEX_KINDS[kind](path, self.csv_path)
+
+    def test_appended_rows_are_indexed(self):
+        for kind in self.eo.DOCUMENT_INDEX_KINDS:
+            with self.subTest(kind=kind):
+                self.write_csv(["2021-00001", "2021-00002"])
+                index = self.open_index(kind)
+                index.close()
+                self.write_csv(["2021-00003"], mode="a")
+                index = self.open_index(kind)
+                self.assertEqual(sorted(index), ["2021-00001", "2021-00002", "2021-00003"])
+                index.close()
+
+    def test_edited_and_grown_csv_is_rebuilt(self):
+        for kind in self.eo.DOCUMENT_INDEX_KINDS:
+            with self.subTest(kind=kind):
+                self.write_csv(["2021-00001", "2021-00002"])
+                index = self.open_index(kind)
+                index.close()
+                # Same rows rewritten with one number changed, then grown past the recorded size
+                self.write_csv(["2021-00001", "2021-00009", "2021-00003"])
+                index = self.open_index(kind)
+                self.assertNotIn("2021-00002", index)
+                self.assertEqual(sorted(index), ["2021-00001", "2021-00003", "2021-00009"])
+                index.close()
+
+class FreshInstallTest(unittest.TestCase):
+    # The first run starts without a CSV; writing it is not a change that needs a rebuild
+    def setUp(self):
+        self.eo = load_checker()
+        saved = {name: getattr(self.eo, name) for name in ("STORAGE_BACKEND", "DOCUMENT_INDEX_KIND")}
+        self.addCleanup(lambda: [setattr(self.eo, name, value) for name, value in saved.items()])
+        self.eo.STORAGE_BACKEND = "csv"
+
+    def test_no_rebuild_message(self):
+        order = {"document_number": "2025-01901", "title": "Order", "publication_date": "2025-01-20"}
+        for kind in self.eo.DOCUMENT_INDEX_KINDS:
+            with self.subTest(kind=kind):
+                use_temp_workdir(self)
+                self.eo.DOCUMENT_INDEX_KIND = kind
+                out = io.StringIO()
+                with contextlib.redirect_stdout(out):
+                    self.assertNotIn("2025-01901", self.eo.load_processed_document_numbers())
+                    self.eo.update_csv_and_date([order])
+                    self.assertIn("2025-01901", self.eo.load_processed_document_numbers())
+                self.assertNotIn("Rebuilding", out.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
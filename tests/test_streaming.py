@@ -0,0 +1,105 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+from support import load_checker, use_temp_workdir
+
+eo = load_checker()
+
+def order(doc_num, publication_date="2025-01-20"):
+    return {"document_number": doc_num, "title": "Order " + doc_num, "publication_date": publication_date,
+            "pdf_url": "", "html_url": ""}
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class IterJsonResultsTest(unittest.TestCase):
+    PAGE = {"count": 2, "description": "Executive orders — “quoted”",
+            "results": [order("2025-01901"), dict(order("2025-01902"), score=1500.25, tags=["a", "b"])],
+            "total_pages": 1, "next_page_url": None}
+
+    def parse(self, data, size):
+        meta = {}
+        results = list(eo.iter_json_results(chunked(data, size), meta))
+        return results, meta
+
+    def test_any_chunk_size(self):
+        data = json.dumps(self.PAGE, ensure_ascii=False, indent=1).encode("utf-8")
+        expected_meta = {key: value for key, value in self.PAGE.items() if key != "results"}
+        # 1 byte splits every multi-byte character and number; the odd sizes land anywhere
+        for size in (1, 3, 7, 13, 4096):
+            with self.subTest(size=size):
+                results, meta = self.parse(data, size)
+                self.assertEqual(results, self.PAGE["results"])
+                self.assertEqual(meta, expected_meta)
+
+    def test_missing_or_empty_results(self):
+        for page in ({"count": 0}, {"count": 0, "results": []}, {}):
+            with self.subTest(page=page):
+                data = json.dumps(page).encode("utf-8")
+                for size in (1, 5, 4096):
+                    results, meta = self.parse(data, size)
+                    self.assertEqual(results, [])
+                    self.assertEqual(meta, {key: value for key, value in page.items() if key != "results"})
+
+    def test_truncated_stream_raises(self):
+        data = json.dumps(self.PAGE).encode("utf-8")[:-20]
+        with self.assertRaises(ValueError):
+            list(eo.iter_json_results(chunked(data, 7)))
+
+class StreamRollbackTest(unittest.TestCase):
+    # A stream that fails part-way must leave storage as it found it, so the next run fetches
+    # the same orders again
+    def setUp(self):
+        use_temp_workdir(self)
+        self._backend = eo.STORAGE_BACKEND
+        self.addCleanup(setattr, eo, "STORAGE_BACKEND", self._backend)
+
+    def failing_stream(self):
+        yield order("2025-01902", "2025-01-21")
+        yield order("2025-01903", "2025-01-21")
+        raise ConnectionError("stream interrupted")
+
+    def record(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            eo.update_csv_and_date([order("2025-01901")])
+
+    def fail_stream(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(ConnectionError):
+                eo.stream_orders_to_storage(self.failing_stream())
+            return eo.load_processed_document_numbers()
+
+    def test_csv_rollback(self):
+        eo.STORAGE_BACKEND = "csv"
+        self.record()
+        with open(eo.CSV_FILE, "rb") as f:
+            before = f.read()
+        mtime_ns = os.stat(eo.CSV_FILE).st_mtime_ns
+        processed = self.fail_stream()
+        with open(eo.CSV_FILE, "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(os.stat(eo.CSV_FILE).st_mtime_ns, mtime_ns)
+        self.assertEqual(eo.get_storage().get_cursor().date, "2025-01-20")
+        self.assertIn("2025-01901", processed)
+        self.assertNotIn("2025-01902", processed)
+
+    def test_csv_rollback_without_history(self):
+        eo.STORAGE_BACKEND = "csv"
+        self.fail_stream()
+        self.assertFalse(os.path.exists(eo.CSV_FILE))
+
+    def test_sqlite_rollback(self):
+        eo.STORAGE_BACKEND = "sqlite"
+        self.record()
+        processed = self.fail_stream()
+        storage = eo.get_storage()
+        self.assertEqual(storage.get_cursor().date, "2025-01-20")
+        self.assertEqual(len(storage), 1)
+        self.assertIn("2025-01901", processed)
+        self.assertNotIn("2025-01902", processed)
+
+if __name__ == "__main__":
+    unittest.main()